@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-15 22:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("polls", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="pollvote",
+            name="poll_votes_option__f8b3bf_idx",
+        ),
+        migrations.AddIndex(
+            model_name="pollvote",
+            index=models.Index(fields=["option", "user"], name="pollvote_opt_user_idx"),
+        ),
+    ]
@@ -98,7 +98,7 @@ class PollVote(models.Model):
         db_table = "poll_votes"
         indexes = [
             models.Index(fields=["poll", "user"]),
-            models.Index(fields=["option"]),
+            models.Index(fields=["option", "user"], name="pollvote_opt_user_idx"),
         ]
 
     def __str__(self) -> str:
@@ -1,4 +1,5 @@
 """Serializers for polls and voting."""
+from django.db import transaction
 from rest_framework import serializers
 
 from apps.users.serializers import UserBasicSerializer
@@ -31,6 +32,8 @@ class PollOptionSerializer(serializers.ModelSerializer):
         return round(obj.calculate_percentage(), 2)
 
     def get_has_voted(self, obj):
+        if hasattr(obj, "viewer_has_voted"):
+            return obj.viewer_has_voted
         request = self.context.get("request")
         if request and request.user.is_authenticated:
             return obj.votes.filter(user=request.user).exists()
@@ -83,13 +86,20 @@ class PollSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ("id", "created_by", "total_votes", "created_at", "updated_at", "closed_at")
 
-    def get_user_votes(self, obj):
+    def _viewer_votes(self, obj):
+        """Return the requesting user's votes, preferring the ``viewer_votes`` prefetch."""
+
+        votes = getattr(obj, "viewer_votes", None)
+        if votes is not None:
+            return votes
         request = self.context.get("request")
         if request and request.user.is_authenticated:
-            votes = obj.votes.filter(user=request.user)
-            return [str(vote.option.id) for vote in votes]
+            return list(obj.votes.filter(user=request.user))
         return []
 
+    def get_user_votes(self, obj):
+        return [str(vote.option_id) for vote in self._viewer_votes(obj)]
+
     def get_is_expired(self, obj):
         return obj.is_expired()
 
@@ -100,7 +110,7 @@ class PollSerializer(serializers.ModelSerializer):
         if obj.status != "active" or obj.is_expired():
             return False
         if not obj.allow_multiple_votes:
-            return not obj.votes.filter(user=request.user).exists()
+            return not self._viewer_votes(obj)
         return True
 
 
@@ -139,14 +149,19 @@ class PollCreateUpdateSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         options_data = validated_data.pop("options")
-        poll = Poll.objects.create(**validated_data)
         request = self.context.get("request")
         created_by = request.user if request and request.user.is_authenticated else None
-        for index, option_text in enumerate(options_data):
-            PollOption.objects.create(
-                poll=poll,
-                option_text=option_text,
-                position=index,
-                added_by=created_by,
+        with transaction.atomic():
+            poll = Poll.objects.create(**validated_data)
+            PollOption.objects.bulk_create(
+                [
+                    PollOption(
+                        poll=poll,
+                        option_text=option_text,
+                        position=index,
+                        added_by=created_by,
+                    )
+                    for index, option_text in enumerate(options_data)
+                ]
             )
         return poll
@@ -1,6 +1,9 @@
 """Poll API views."""
+import hashlib
+
+from django.core.cache import cache
 from django.db import transaction
-from django.db.models import F
+from django.db.models import Count, Exists, F, Max, Min, OuterRef, Prefetch, Q
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
@@ -9,13 +12,15 @@ from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 
-from apps.users.serializers import UserBasicSerializer
+from apps.users.serializers import UserBasicSerializer, user_basic_fields
 from apps.roles.models import ServerMember
 from apps.servers.models import Server
 
 from .models import Poll, PollComment, PollOption, PollVote
 from .serializers import PollCommentSerializer, PollCreateUpdateSerializer, PollSerializer
 
+POLL_LIST_CACHE_TIMEOUT = 300
+
 
 class PollViewSet(viewsets.ModelViewSet):
     """ViewSet for managing polls and voting."""
@@ -45,9 +50,86 @@ class PollViewSet(viewsets.ModelViewSet):
             server=server, user=self.request.user, is_banned=False
         ).exists() and server.owner != self.request.user and not self.request.user.is_admin:
             raise PermissionDenied("You do not have access to this server's polls.")
-        return Poll.objects.filter(server=server, is_deleted=False).select_related(
-            "created_by", "server"
-        ).prefetch_related("options")
+        user = self.request.user
+        options = PollOption.objects.select_related("added_by").annotate(
+            viewer_has_voted=Exists(PollVote.objects.filter(option=OuterRef("pk"), user=user))
+        ).only(
+            "id",
+            "poll_id",
+            "option_text",
+            "position",
+            "vote_count",
+            "created_at",
+            *user_basic_fields("added_by"),
+        )
+        return (
+            Poll.objects.filter(server=server, is_deleted=False)
+            .select_related("created_by", "server")
+            .only(
+                "id",
+                "question",
+                "description",
+                "server__id",
+                "server__owner_id",
+                "channel_id",
+                "status",
+                "allow_multiple_votes",
+                "allow_add_options",
+                "anonymous_votes",
+                "show_results_before_vote",
+                "expires_at",
+                "total_votes",
+                "created_at",
+                "updated_at",
+                "closed_at",
+                *user_basic_fields("created_by"),
+            )
+            .prefetch_related(
+                Prefetch("options", queryset=options),
+                Prefetch(
+                    "votes",
+                    queryset=PollVote.objects.filter(user=user).only("id", "poll_id", "option_id"),
+                    to_attr="viewer_votes",
+                ),
+            )
+        )
+
+    def list(self, request, *args, **kwargs):  # type: ignore[override]
+        queryset = self.get_queryset()
+        # Every poll mutation bumps updated_at and deletions change the count, so either rotates the key.
+        # is_expired/can_vote flip without a write when a poll expires, so the next expiry is part of the
+        # version too and bounds how long the page may be cached.
+        now = timezone.now()
+        version = Poll.objects.filter(server_id=self.kwargs["server_id"], is_deleted=False).aggregate(
+            last_modified=Max("updated_at"),
+            poll_count=Count("id"),
+            next_expiry=Min("expires_at", filter=Q(expires_at__gte=now)),
+        )
+        last_modified = version["last_modified"].timestamp() if version["last_modified"] else 0
+        next_expiry = version["next_expiry"]
+        timeout = POLL_LIST_CACHE_TIMEOUT
+        if next_expiry is not None:
+            timeout = min(timeout, max((next_expiry - now).total_seconds(), 1))
+        query = hashlib.md5(request.GET.urlencode().encode()).hexdigest()
+        cache_key = (
+            f"polls:list:{self.kwargs['server_id']}:{request.user.id}:"
+            f"{last_modified}:{version['poll_count']}:"
+            f"{next_expiry.timestamp() if next_expiry else 0}:{query}"
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return Response(cached)
+
+        queryset = self.filter_queryset(queryset)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            response = self.get_paginated_response(serializer.data)
+        else:
+            serializer = self.get_serializer(queryset, many=True)
+            response = Response(serializer.data)
+        cache.set(cache_key, response.data, timeout)
+        return response
 
     def perform_create(self, serializer):
         server_id = self.kwargs.get("server_id")
@@ -61,7 +143,7 @@ class PollViewSet(viewsets.ModelViewSet):
     def perform_destroy(self, instance):
         instance.is_deleted = True
         instance.deleted_at = timezone.now()
-        instance.save(update_fields=["is_deleted", "deleted_at"])
+        instance.save(update_fields=["is_deleted", "deleted_at", "updated_at"])
 
     @action(detail=True, methods=["post"])
     def vote(self, request, server_id=None, pk=None):
@@ -91,7 +173,9 @@ class PollViewSet(viewsets.ModelViewSet):
                 PollVote.objects.create(poll=poll, option=option, user=request.user)
                 PollOption.objects.filter(id=option.id).update(vote_count=F("vote_count") + 1)
             poll.total_votes = poll.votes.values("user").distinct().count()
-            poll.save(update_fields=["total_votes"])
+            poll.save(update_fields=["total_votes", "updated_at"])
+        # Reload so the prefetched options and viewer votes reflect the new ballot.
+        poll = self.get_queryset().get(pk=poll.pk)
         serializer = PollSerializer(poll, context={"request": request})
         return Response({"message": "Vote recorded successfully", "poll": serializer.data})
 
@@ -105,8 +189,10 @@ class PollViewSet(viewsets.ModelViewSet):
             option_ids = votes.values_list("option_id", flat=True)
             PollOption.objects.filter(id__in=option_ids).update(vote_count=F("vote_count") - 1)
             votes.delete()
-            poll.total_votes = poll.votes.values("user").distinct().count()
-            poll.save(update_fields=["total_votes"])
+            # total_votes counts distinct voters and this user no longer has any votes.
+            Poll.objects.filter(pk=poll.pk, total_votes__gt=0).update(
+                total_votes=F("total_votes") - 1, updated_at=timezone.now()
+            )
         return Response({"message": "Vote removed successfully"})
 
     @action(detail=True, methods=["get"])
@@ -146,7 +232,7 @@ class PollViewSet(viewsets.ModelViewSet):
             )
         poll.status = "closed"
         poll.closed_at = timezone.now()
-        poll.save(update_fields=["status", "closed_at"])
+        poll.save(update_fields=["status", "closed_at", "updated_at"])
         return Response({"message": "Poll closed successfully"})
 
     @action(detail=True, methods=["get", "post"])
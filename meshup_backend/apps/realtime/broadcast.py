@@ -0,0 +1,124 @@
+"""Group broadcast helpers: message.created coalescing and a background dispatcher for sync code."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from asgiref.sync import async_to_sync
+from channels.layers import InMemoryChannelLayer
+
+from .utils import EncodedPayload, encode_event_frame, join_payloads
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_BROADCAST_WINDOW = 0.005
+MESSAGE_BROADCAST_MAX_BATCH = 16
+DISPATCH_BATCH_SIZE = 64
+
+
+class _MessageBuffer:
+    """Message payloads waiting to be fanned out to a single group."""
+
+    def __init__(self, channel_layer, loop: asyncio.AbstractEventLoop):
+        self.channel_layer = channel_layer
+        self.loop = loop
+        self.payloads: List[EncodedPayload] = []
+        self.handle: Optional[asyncio.TimerHandle] = None
+
+
+_buffers: Dict[str, _MessageBuffer] = {}
+_flush_tasks: Set[asyncio.Task] = set()
+
+
+def queue_message_created(channel_layer, group_name: str, payload: EncodedPayload) -> None:
+    """Queue a message.created broadcast; a burst goes out as one message.created.batch frame."""
+
+    loop = asyncio.get_running_loop()
+    buffer = _buffers.get(group_name)
+    if buffer is None or buffer.loop is not loop:
+        buffer = _MessageBuffer(channel_layer, loop)
+        _buffers[group_name] = buffer
+        buffer.handle = loop.call_later(MESSAGE_BROADCAST_WINDOW, _schedule_flush, group_name, buffer)
+
+    buffer.payloads.append(payload)
+    if len(buffer.payloads) >= MESSAGE_BROADCAST_MAX_BATCH:
+        buffer.handle.cancel()
+        _schedule_flush(group_name, buffer)
+
+
+def _schedule_flush(group_name: str, buffer: _MessageBuffer) -> None:
+    if _buffers.get(group_name) is buffer:
+        del _buffers[group_name]
+    task = buffer.loop.create_task(_flush(group_name, buffer))
+    _flush_tasks.add(task)
+    task.add_done_callback(_flush_tasks.discard)
+
+
+async def _flush(group_name: str, buffer: _MessageBuffer) -> None:
+    if len(buffer.payloads) == 1:
+        frame = encode_event_frame("message.created", buffer.payloads[0])
+    else:
+        frame = encode_event_frame("message.created.batch", join_payloads(buffer.payloads))
+    await buffer.channel_layer.group_send(group_name, frame)
+
+
+class _GroupSendDispatcher:
+    """Publish group messages queued from sync code on one long-lived background event loop."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+
+    def send(self, channel_layer, group_name: str, message: Dict[str, Any]) -> None:
+        if isinstance(channel_layer, InMemoryChannelLayer):
+            # In-memory channel queues belong to the consumers' loop and are not thread-safe.
+            async_to_sync(channel_layer.group_send)(group_name, message)
+            return
+        loop, queue = self._start()
+        loop.call_soon_threadsafe(queue.put_nowait, (channel_layer, group_name, message))
+
+    def _start(self) -> Tuple[asyncio.AbstractEventLoop, asyncio.Queue]:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                queue: asyncio.Queue = asyncio.Queue()
+                threading.Thread(
+                    target=loop.run_until_complete,
+                    args=(self._run(queue),),
+                    name="realtime-group-send",
+                    daemon=True,
+                ).start()
+                self._loop, self._queue = loop, queue
+            return self._loop, self._queue
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < DISPATCH_BATCH_SIZE and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            by_group: Dict[Tuple[int, str], List[Tuple[Any, Dict[str, Any]]]] = defaultdict(list)
+            for channel_layer, group_name, message in batch:
+                by_group[(id(channel_layer), group_name)].append((channel_layer, message))
+            await asyncio.gather(*(self._send_in_order(group, items) for (_, group), items in by_group.items()))
+
+    async def _send_in_order(self, group_name: str, items: List[Tuple[Any, Dict[str, Any]]]) -> None:
+        # Groups are published concurrently, but events within one group keep their order.
+        for channel_layer, message in items:
+            try:
+                await channel_layer.group_send(group_name, message)
+            except Exception:
+                logger.exception("Realtime group_send to %s failed", group_name)
+
+
+_dispatcher = _GroupSendDispatcher()
+
+
+def dispatch_group_send(channel_layer, group_name: str, message: Dict[str, Any]) -> None:
+    """Queue a group_send from synchronous code without blocking on the channel layer."""
+
+    _dispatcher.send(channel_layer, group_name, message)
@@ -1,78 +1,238 @@
 """Realtime websocket consumers for live messaging."""
 from __future__ import annotations
 
+import asyncio
+import time
+from collections import namedtuple
 from typing import Any, Dict, Optional
 
-from asgiref.sync import sync_to_async
+import msgpack
+import orjson
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from django.contrib.auth.models import AnonymousUser
-from django.utils import timezone
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 
 from apps.channels.models import Channel
 from apps.messages.models import DirectMessage, DirectMessageMessage, Message
+from apps.roles.cache import MEMBERSHIP_CACHE_TIMEOUT, membership_cache_key
 from apps.roles.models import ServerMember
 from apps.users.models import User
 
+from .broadcast import queue_message_created
+from . import presence
+from .presence import PresenceLease, queue_presence
 from .utils import (
+    CHANNEL_CACHE_TIMEOUT,
+    channel_cache_key,
+    dm_participant_cache_key,
+    encode_event_frame,
+    encode_frame,
+    encode_payload,
     serialize_dm_message_for_realtime,
-    serialize_message_for_realtime,
+    serialize_new_message_for_realtime,
     serialize_user_basic,
 )
+from .writer import dm_timestamp_writer
 
+MSGPACK_SUBPROTOCOL = "msgpack"
+TYPING_THROTTLE_SECONDS = 1.5
+TYPING_IDLE_TIMEOUT = 3.0
 
-@sync_to_async
-def _get_channel(channel_id: str) -> Channel:
-    return Channel.objects.select_related("server").get(id=channel_id)
 
+ChannelInfo = namedtuple("ChannelInfo", ("id", "server_id", "owner_id"))
 
-@sync_to_async
-def _user_is_member(server_id, user: User) -> bool:
+_EMPTY_PAYLOAD: Dict[str, Any] = {}
+EMPTY_MESSAGE_FRAME = encode_frame({"event": "error", "detail": "Message content cannot be empty."})
+MISSING_REPLY_FRAME = encode_frame({"event": "error", "detail": "Reply target does not exist."})
+
+
+def _message_payload(content: Dict[str, Any]) -> Dict[str, Any]:
+    payload = content.get("payload")
+    return payload if isinstance(payload, dict) else _EMPTY_PAYLOAD
+
+
+def _message_text(payload: Dict[str, Any]) -> str:
+    text = payload.get("content")
+    return text.strip() if isinstance(text, str) else ""
+
+
+async def _get_channel(channel_id: str) -> ChannelInfo:
+    key = channel_cache_key(channel_id)
+    cached = await cache.aget(key)
+    if cached is None:
+        row = await Channel.objects.values_list("id", "server_id", "server__owner_id").aget(id=channel_id)
+        cached = [str(value) for value in row]
+        await cache.aset(key, cached, CHANNEL_CACHE_TIMEOUT)
+    return ChannelInfo(*cached)
+
+
+async def _user_is_member(server_id, user: User) -> bool:
     if getattr(user, "is_admin", False):
         return True
     if user.is_anonymous:
         return False
-    return ServerMember.objects.filter(server_id=server_id, user=user, is_banned=False).exists()
+    key = membership_cache_key(server_id, user.id)
+    is_member = await cache.aget(key)
+    if is_member is None:
+        is_member = await ServerMember.objects.filter(server_id=server_id, user=user, is_banned=False).aexists()
+        await cache.aset(key, is_member, MEMBERSHIP_CACHE_TIMEOUT)
+    return is_member
 
 
-@sync_to_async
-def _create_message(*, channel: Channel, author: User, content: str, reply_to: Optional[str] = None) -> Message:
-    kwargs: Dict[str, Any] = {
-        "channel": channel,
-        "author": author,
-        "content": content,
-    }
+async def _create_message(*, channel_id: str, author: User, content: str, reply_to: Optional[str] = None) -> Message:
+    message = Message(channel_id=channel_id, author=author, content=content)
     if reply_to:
-        kwargs["reply_to_id"] = reply_to
-    return Message.objects.create(**kwargs)
-
+        message.reply_to = await Message.objects.select_related("author").aget(id=reply_to)
+    # The consumer broadcasts from the event loop itself; see broadcast_message_created.
+    message._from_websocket = True
+    await message.asave(force_insert=True)
+    return message
 
-@sync_to_async
-def _get_dm(dm_id: str) -> DirectMessage:
-    return DirectMessage.objects.prefetch_related("participants").get(id=dm_id)
 
-
-@sync_to_async
-def _user_in_dm(dm: DirectMessage, user: User) -> bool:
+async def _user_in_dm(dm: DirectMessage, user: User) -> bool:
     if getattr(user, "is_admin", False):
         return True
     if user.is_anonymous:
         return False
-    return dm.participants.filter(id=user.id).exists()
+    key = dm_participant_cache_key(dm.id, user.id)
+    is_participant = await cache.aget(key)
+    if is_participant is None:
+        is_participant = await dm.participants.filter(id=user.id).aexists()
+        await cache.aset(key, is_participant, MEMBERSHIP_CACHE_TIMEOUT)
+    return is_participant
+
+
+async def _create_dm_message(*, dm_channel: DirectMessage, author: User, content: str) -> DirectMessageMessage:
+    dm_message = DirectMessageMessage(dm_channel=dm_channel, author=author, content=content)
+    # The consumer broadcasts from the event loop itself; see broadcast_dm_message_created.
+    dm_message._from_websocket = True
+    await dm_message.asave(force_insert=True)
+    return dm_message
 
 
-@sync_to_async
-def _create_dm_message(*, dm_channel: DirectMessage, author: User, content: str) -> DirectMessageMessage:
-    dm_message = DirectMessageMessage.objects.create(dm_channel=dm_channel, author=author, content=content)
-    dm_channel.last_message_at = timezone.now()
-    dm_channel.save(update_fields=["last_message_at"])
-    return dm_message
+class RealtimeJsonConsumer(AsyncJsonWebsocketConsumer):
+    """JSON websocket consumer using orjson, or MessagePack binary frames when negotiated."""
+
+    group_name: str
+    user_payload: Dict[str, Any]
+    _typing_active = False
+    _typing_sent_at = 0.0
+    _typing_timeout: Optional[asyncio.TimerHandle] = None
+    _typing_stop_task: Optional[asyncio.Task] = None
+    _presence: Optional[PresenceLease] = None
+    _presence_refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def uses_msgpack(self) -> bool:
+        return MSGPACK_SUBPROTOCOL in self.scope.get("subprotocols", ())
+
+    async def accept(self, subprotocol=None):
+        if subprotocol is None and self.uses_msgpack:
+            subprotocol = MSGPACK_SUBPROTOCOL
+        await super().accept(subprotocol)
+
+    async def receive(self, text_data=None, bytes_data=None, **kwargs):
+        if bytes_data is not None and self.uses_msgpack:
+            await self.receive_json(msgpack.unpackb(bytes_data), **kwargs)
+            return
+        await super().receive(text_data=text_data, bytes_data=bytes_data, **kwargs)
+
+    async def send_json(self, content, close=False):
+        if self.uses_msgpack:
+            await self.send(bytes_data=msgpack.packb(content), close=close)
+            return
+        await super().send_json(content, close=close)
+
+    @classmethod
+    async def decode_json(cls, text_data):
+        return orjson.loads(text_data)
 
+    @classmethod
+    async def encode_json(cls, content):
+        return orjson.dumps(content).decode()
+
+    async def _broadcast_typing(self, event: str):
+        """Fan out typing state, throttling repeated starts and expiring idle typists."""
+
+        if event == "typing.start":
+            self._schedule_typing_timeout()
+            now = time.monotonic()
+            if self._typing_active and now - self._typing_sent_at < TYPING_THROTTLE_SECONDS:
+                return
+            self._typing_active = True
+            self._typing_sent_at = now
+        else:
+            self._cancel_typing_timeout()
+            if not self._typing_active:
+                return
+            self._typing_active = False
+
+        await self.channel_layer.group_send(
+            self.group_name,
+            encode_frame({"event": event, "payload": {"user": self.user_payload}}),
+        )
+
+    def _schedule_typing_timeout(self) -> None:
+        self._cancel_typing_timeout()
+        loop = asyncio.get_running_loop()
+        self._typing_timeout = loop.call_later(TYPING_IDLE_TIMEOUT, self._expire_typing)
+
+    def _cancel_typing_timeout(self) -> None:
+        if self._typing_timeout is not None:
+            self._typing_timeout.cancel()
+            self._typing_timeout = None
+
+    def _expire_typing(self) -> None:
+        self._typing_timeout = None
+        self._typing_stop_task = asyncio.get_running_loop().create_task(self._broadcast_typing("typing.stop"))
+
+    async def _broadcast_presence(self, *, event: str):
+        # Only a user's first connection to a group announces a join, and only the last one a leave.
+        if event == "presence.join":
+            self._presence = PresenceLease(self.group_name, self.user_payload["id"])
+            changed = await self._presence.acquire()
+            self._presence_refresh_task = asyncio.get_running_loop().create_task(self._refresh_presence_forever())
+        else:
+            if self._presence_refresh_task is not None:
+                self._presence_refresh_task.cancel()
+                self._presence_refresh_task = None
+            changed = self._presence is not None and await self._presence.release()
+        if changed:
+            queue_presence(self.channel_layer, self.group_name, event=event, user=self.user_payload)
+
+    async def _refresh_presence_forever(self):
+        # The shared count expires unless renewed; clients that never ping must not lose it.
+        while True:
+            await asyncio.sleep(presence.PRESENCE_REFRESH_INTERVAL)
+            await self._presence.refresh()
+
+    async def _handle_presence_ping(self):
+        # Heartbeats refresh the shared presence record and are answered to the sender only.
+        await self._presence.refresh()
+        await self.send_json({"event": "presence.alive", "payload": {"user": self.user_payload}})
+
+    async def realtime_frame(self, event: Dict[str, Any]):
+        """Forward a frame the sender already encoded once for the whole group."""
+
+        if self.uses_msgpack:
+            await self.send(bytes_data=event["bytes"])
+        else:
+            await self.send(text_data=event["text"])
+
+    async def realtime_message(self, event: Dict[str, Any]):
+        await self.send_json(event)
+
+    async def realtime_broadcast(self, event: Dict[str, Any]):
+        await self.send_json(event)
 
-class ChannelChatConsumer(AsyncJsonWebsocketConsumer):
+
+class ChannelChatConsumer(RealtimeJsonConsumer):
     """Handle live messaging, typing indicators, and presence updates."""
 
     group_name: str
-    channel: Channel
+    channel: ChannelInfo
+    user_payload: Dict[str, Any]
 
     async def connect(self) -> None:
         user = self.scope.get("user")
@@ -88,15 +248,16 @@ class ChannelChatConsumer(AsyncJsonWebsocketConsumer):
             await self.close(code=4404)
             return
 
-        if str(self.channel.server_id) != self.server_id:
+        if self.channel.server_id != self.server_id:
             await self.close(code=4403)
             return
 
-        has_access = await _user_is_member(self.server_id, user) or self.channel.server.owner_id == user.id
+        has_access = await _user_is_member(self.server_id, user) or self.channel.owner_id == str(user.id)
         if not has_access:
             await self.close(code=4403)
             return
 
+        self.user_payload = serialize_user_basic(user)
         self.group_name = f"realtime.channel.{self.channel_id}"
 
         await self.channel_layer.group_add(self.group_name, self.channel_name)
@@ -104,6 +265,7 @@ class ChannelChatConsumer(AsyncJsonWebsocketConsumer):
         await self._broadcast_presence(event="presence.join")
 
     async def disconnect(self, close_code):
+        self._cancel_typing_timeout()
         if hasattr(self, "group_name"):
             await self.channel_layer.group_discard(self.group_name, self.channel_name)
             await self._broadcast_presence(event="presence.leave")
@@ -118,56 +280,36 @@ class ChannelChatConsumer(AsyncJsonWebsocketConsumer):
         elif event in {"typing.start", "typing.stop"}:
             await self._broadcast_typing(event)
         elif event == "presence.ping":
-            await self._broadcast_presence(event="presence.alive")
+            await self._handle_presence_ping()
 
     async def _handle_message_send(self, content: Dict[str, Any]):
-        text = (content.get("payload") or {}).get("content", "").strip()
-        reply_to = (content.get("payload") or {}).get("reply_to")
+        incoming = _message_payload(content)
+        text = _message_text(incoming)
         if not text:
-            await self.send_json({"event": "error", "detail": "Message content cannot be empty."})
+            await self.realtime_frame(EMPTY_MESSAGE_FRAME)
             return
+        reply_to = incoming.get("reply_to")
 
         user: User = self.scope["user"]
-        message = await _create_message(channel=self.channel, author=user, content=text, reply_to=reply_to)
-        payload = await sync_to_async(serialize_message_for_realtime)(message)
-        await self.send_json({"event": "message.ack", "payload": payload})
-
-    async def _broadcast_presence(self, *, event: str):
-        await self.channel_layer.group_send(
-            self.group_name,
-            {
-                "type": "realtime.broadcast",
-                "event": event,
-                "payload": {
-                    "user": serialize_user_basic(self.scope["user"]),
-                },
-            },
-        )
-
-    async def _broadcast_typing(self, event: str):
-        await self.channel_layer.group_send(
-            self.group_name,
-            {
-                "type": "realtime.broadcast",
-                "event": event,
-                "payload": {
-                    "user": serialize_user_basic(self.scope["user"]),
-                },
-            },
-        )
-
-    async def realtime_message(self, event: Dict[str, Any]):
-        await self.send_json(event)
+        try:
+            message = await _create_message(channel_id=self.channel.id, author=user, content=text, reply_to=reply_to)
+        except (Message.DoesNotExist, ValidationError):
+            await self.realtime_frame(MISSING_REPLY_FRAME)
+            return
 
-    async def realtime_broadcast(self, event: Dict[str, Any]):
-        await self.send_json(event)
+        # The row is committed before anyone hears about it; only the broadcast is coalesced.
+        payload = encode_payload(serialize_new_message_for_realtime(message, author=self.user_payload))
+        # The ack and the group broadcast embed the same encoded payload.
+        await self.realtime_frame(encode_event_frame("message.ack", payload))
+        queue_message_created(self.channel_layer, self.group_name, payload)
 
 
-class DirectMessageConsumer(AsyncJsonWebsocketConsumer):
+class DirectMessageConsumer(RealtimeJsonConsumer):
     """Handle realtime direct message interactions."""
 
     group_name: str
     dm_channel: DirectMessage
+    user_payload: Dict[str, Any]
 
     async def connect(self) -> None:
         user = self.scope.get("user")
@@ -177,7 +319,7 @@ class DirectMessageConsumer(AsyncJsonWebsocketConsumer):
 
         self.dm_id = str(self.scope["url_route"]["kwargs"]["dm_id"])
         try:
-            self.dm_channel = await _get_dm(self.dm_id)
+            self.dm_channel = await DirectMessage.objects.aget(id=self.dm_id)
         except DirectMessage.DoesNotExist:
             await self.close(code=4404)
             return
@@ -187,6 +329,7 @@ class DirectMessageConsumer(AsyncJsonWebsocketConsumer):
             await self.close(code=4403)
             return
 
+        self.user_payload = serialize_user_basic(user)
         self.group_name = f"realtime.dm.{self.dm_id}"
 
         await self.channel_layer.group_add(self.group_name, self.channel_name)
@@ -194,9 +337,11 @@ class DirectMessageConsumer(AsyncJsonWebsocketConsumer):
         await self._broadcast_presence(event="presence.join")
 
     async def disconnect(self, close_code):
+        self._cancel_typing_timeout()
         if hasattr(self, "group_name"):
             await self.channel_layer.group_discard(self.group_name, self.channel_name)
             await self._broadcast_presence(event="presence.leave")
+        await dm_timestamp_writer.drain()
 
     async def receive_json(self, content: Dict[str, Any], *args, **kwargs):
         event = content.get("event")
@@ -208,45 +353,18 @@ class DirectMessageConsumer(AsyncJsonWebsocketConsumer):
         elif event in {"typing.start", "typing.stop"}:
             await self._broadcast_typing(event)
         elif event == "presence.ping":
-            await self._broadcast_presence(event="presence.alive")
+            await self._handle_presence_ping()
 
     async def _handle_message_send(self, content: Dict[str, Any]):
-        text = (content.get("payload") or {}).get("content", "").strip()
+        text = _message_text(_message_payload(content))
         if not text:
-            await self.send_json({"event": "error", "detail": "Message content cannot be empty."})
+            await self.realtime_frame(EMPTY_MESSAGE_FRAME)
             return
 
         user: User = self.scope["user"]
         dm_message = await _create_dm_message(dm_channel=self.dm_channel, author=user, content=text)
-        payload = await sync_to_async(serialize_dm_message_for_realtime)(dm_message)
-        await self.send_json({"event": "message.ack", "payload": payload})
-
-    async def _broadcast_presence(self, *, event: str):
-        await self.channel_layer.group_send(
-            self.group_name,
-            {
-                "type": "realtime.broadcast",
-                "event": event,
-                "payload": {
-                    "user": serialize_user_basic(self.scope["user"]),
-                },
-            },
-        )
-
-    async def _broadcast_typing(self, event: str):
-        await self.channel_layer.group_send(
-            self.group_name,
-            {
-                "type": "realtime.broadcast",
-                "event": event,
-                "payload": {
-                    "user": serialize_user_basic(self.scope["user"]),
-                },
-            },
-        )
-
-    async def realtime_message(self, event: Dict[str, Any]):
-        await self.send_json(event)
-
-    async def realtime_broadcast(self, event: Dict[str, Any]):
-        await self.send_json(event)
+        # last_message_at is bumped by a debounced bulk UPDATE instead of one save per message.
+        dm_timestamp_writer.touch(self.dm_channel.id, dm_message.created_at)
+        payload = encode_payload(serialize_dm_message_for_realtime(dm_message))
+        await self.realtime_frame(encode_event_frame("message.ack", payload))
+        queue_message_created(self.channel_layer, self.group_name, payload)
@@ -1,38 +1,81 @@
 """Custom authentication middleware for websocket connections using JWT tokens."""
 from __future__ import annotations
 
-from typing import Optional
-from urllib.parse import parse_qs
+import re
+import time
+from hashlib import blake2b
+from typing import Dict, Optional, Tuple
+from urllib.parse import unquote_to_bytes
 
+import jwt
 from channels.auth import AuthMiddlewareStack
 from channels.db import database_sync_to_async
 from channels.middleware import BaseMiddleware
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 from django.utils.functional import LazyObject
-from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.settings import api_settings
 
 User = get_user_model()
 
+_QUERY_TOKEN_RE = re.compile(rb"(?:^|&)token=([^&]+)")
+
+TOKEN_CACHE_TTL = 60
+TOKEN_CACHE_MAX_SIZE = 10000
+
+# blake2b(token) -> (user id, monotonic deadline); never outlives the token's own expiry.
+_TOKEN_CACHE: Dict[bytes, Tuple[str, float]] = {}
+
 
 @database_sync_to_async
 def _get_user(user_id: str):
     return User.objects.get(id=user_id)
 
 
+def _decode_access_token(token: str) -> Dict:
+    """Validate an access token the way SimpleJWT's AccessToken does and return its payload."""
+
+    algorithm = api_settings.ALGORITHM
+    verifying_key = api_settings.SIGNING_KEY if algorithm.startswith("HS") else api_settings.VERIFYING_KEY
+    payload = jwt.decode(
+        token,
+        verifying_key,
+        algorithms=[algorithm],
+        audience=api_settings.AUDIENCE,
+        issuer=api_settings.ISSUER,
+        leeway=api_settings.LEEWAY,
+        options={"verify_aud": api_settings.AUDIENCE is not None, "require": ["exp"]},
+    )
+    if api_settings.JTI_CLAIM is not None and api_settings.JTI_CLAIM not in payload:
+        raise jwt.InvalidTokenError("Token has no id")
+    if api_settings.TOKEN_TYPE_CLAIM is not None and payload.get(api_settings.TOKEN_TYPE_CLAIM) != "access":
+        raise jwt.InvalidTokenError("Token has wrong type")
+    return payload
+
+
+def _get_user_id(token: str) -> str:
+    key = blake2b(token.encode(), digest_size=16).digest()
+    cached = _TOKEN_CACHE.get(key)
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+
+    payload = _decode_access_token(token)
+    user_id = str(payload[api_settings.USER_ID_CLAIM])
+    if len(_TOKEN_CACHE) >= TOKEN_CACHE_MAX_SIZE:
+        _TOKEN_CACHE.pop(next(iter(_TOKEN_CACHE)))
+    _TOKEN_CACHE[key] = (user_id, time.monotonic() + min(TOKEN_CACHE_TTL, payload["exp"] - time.time()))
+    return user_id
+
+
 def _extract_token(scope) -> Optional[str]:
-    query_string = scope.get("query_string", b"").decode()
-    params = parse_qs(query_string)
-    token = params.get("token", [None])[0]
-    if token:
-        return token
+    match = _QUERY_TOKEN_RE.search(scope.get("query_string", b""))
+    if match:
+        return unquote_to_bytes(match.group(1).replace(b"+", b" ")).decode()
 
+    # ASGI servers lower-case header names, so they can be compared as raw bytes.
     for header_name, header_value in scope.get("headers", []):
-        if header_name.decode().lower() == "authorization":
-            value = header_value.decode()
-            if value.lower().startswith("bearer "):
-                return value.split(" ", 1)[1]
+        if header_name == b"authorization" and header_value[:7].lower() == b"bearer ":
+            return header_value[7:].decode()
     return None
 
 
@@ -47,10 +90,9 @@ class JWTAuthMiddleware(BaseMiddleware):
         token = _extract_token(scope)
         if token:
             try:
-                access_token = AccessToken(token)
-                user = await _get_user(access_token["user_id"])
+                user = await _get_user(_get_user_id(token))
                 scope["user"] = user
-            except (TokenError, InvalidToken, KeyError, User.DoesNotExist):
+            except (jwt.InvalidTokenError, KeyError, User.DoesNotExist):
                 scope["user"] = AnonymousUser()
 
         return await super().__call__(scope, receive, send)
@@ -0,0 +1,155 @@
+"""Presence bookkeeping: per-user connection counts and coalesced join/leave fan-out."""
+from __future__ import annotations
+
+import asyncio
+import uuid
+from typing import Any, Dict, Optional, Set, Tuple
+
+from django.core.cache import cache
+
+from .utils import encode_frame
+
+PRESENCE_FLUSH_INTERVAL = 0.2
+PRESENCE_TIMEOUT = 120
+# Open connections renew their count well inside the timeout, whether or not the client pings.
+PRESENCE_REFRESH_INTERVAL = PRESENCE_TIMEOUT / 4
+
+_OPPOSITE_EVENTS = {
+    "presence.join": "presence.leave",
+    "presence.leave": "presence.join",
+}
+
+
+def presence_cache_key(group_name: str, user_id) -> str:
+    """Cache key naming the current epoch of a user's connection count in a realtime group."""
+
+    return f"realtime:presence:{group_name}:{user_id}"
+
+
+def _count_key(group_name: str, user_id, epoch: str) -> str:
+    return f"realtime:presence:{group_name}:{user_id}:{epoch}"
+
+
+async def _increment(key: str) -> int:
+    await cache.aadd(key, 0, PRESENCE_TIMEOUT)
+    try:
+        return await cache.aincr(key)
+    except ValueError:
+        # Expired between add and incr.
+        await cache.aset(key, 1, PRESENCE_TIMEOUT)
+        return 1
+
+
+class PresenceLease:
+    """One connection's share of a user's connection count in a realtime group.
+
+    Counts live under an epoch so that, once a count expires, every connection still open
+    re-registers under the new epoch exactly once instead of guessing how many others did.
+    """
+
+    def __init__(self, group_name: str, user_id):
+        self.group_name = group_name
+        self.user_id = user_id
+        self.epoch: Optional[str] = None
+
+    @property
+    def _pointer_key(self) -> str:
+        return presence_cache_key(self.group_name, self.user_id)
+
+    async def _join_current_epoch(self) -> int:
+        epoch = await cache.aget(self._pointer_key)
+        if epoch is None:
+            await cache.aadd(self._pointer_key, uuid.uuid4().hex, PRESENCE_TIMEOUT)
+            epoch = await cache.aget(self._pointer_key)
+        else:
+            await cache.atouch(self._pointer_key, PRESENCE_TIMEOUT)
+        self.epoch = epoch
+        return await _increment(_count_key(self.group_name, self.user_id, epoch))
+
+    async def acquire(self) -> bool:
+        """Count this connection; returns True when it is the user's first one in the group."""
+
+        return await self._join_current_epoch() == 1
+
+    async def refresh(self) -> None:
+        """Keep the count alive, re-registering this connection if the count expired meanwhile."""
+
+        if await cache.aget(self._pointer_key) == self.epoch and await cache.atouch(
+            _count_key(self.group_name, self.user_id, self.epoch), PRESENCE_TIMEOUT
+        ):
+            await cache.atouch(self._pointer_key, PRESENCE_TIMEOUT)
+            return
+        await self._join_current_epoch()
+
+    async def release(self) -> bool:
+        """Drop this connection; returns True when the user has no connections left in the group.
+
+        A lost count (expired, evicted or replaced by a newer epoch) is not proof that this was the
+        last connection, so no leave is reported for it.
+        """
+
+        if self.epoch is None or await cache.aget(self._pointer_key) != self.epoch:
+            return False
+        key = _count_key(self.group_name, self.user_id, self.epoch)
+        try:
+            count = await cache.adecr(key)
+        except ValueError:
+            return False
+        if count <= 0:
+            await cache.adelete_many([key, self._pointer_key])
+            return True
+        return False
+
+
+class _PresenceBuffer:
+    """Pending presence transitions for a single group, keyed by user id."""
+
+    def __init__(self, channel_layer, loop: asyncio.AbstractEventLoop):
+        self.channel_layer = channel_layer
+        self.loop = loop
+        self.events: Dict[Any, Tuple[str, Dict[str, Any]]] = {}
+
+
+_buffers: Dict[str, _PresenceBuffer] = {}
+_flush_tasks: Set[asyncio.Task] = set()
+
+
+def queue_presence(channel_layer, group_name: str, *, event: str, user: Dict[str, Any]) -> None:
+    """Queue a join/leave transition; bursts are flushed as one group message."""
+
+    loop = asyncio.get_running_loop()
+    buffer = _buffers.get(group_name)
+    if buffer is None or buffer.loop is not loop:
+        buffer = _PresenceBuffer(channel_layer, loop)
+        _buffers[group_name] = buffer
+        loop.call_later(PRESENCE_FLUSH_INTERVAL, _schedule_flush, group_name, buffer)
+
+    user_id = user.get("id")
+    pending = buffer.events.get(user_id)
+    if pending is not None and pending[0] == _OPPOSITE_EVENTS.get(event):
+        # A reconnect (or a connect immediately dropped) inside one window nets out to nothing.
+        del buffer.events[user_id]
+        return
+    buffer.events[user_id] = (event, user)
+
+
+def _schedule_flush(group_name: str, buffer: _PresenceBuffer) -> None:
+    task = buffer.loop.create_task(_flush(group_name, buffer))
+    _flush_tasks.add(task)
+    task.add_done_callback(_flush_tasks.discard)
+
+
+async def _flush(group_name: str, buffer: _PresenceBuffer) -> None:
+    if _buffers.get(group_name) is buffer:
+        del _buffers[group_name]
+    if not buffer.events:
+        return
+
+    if len(buffer.events) == 1:
+        (event, user), = buffer.events.values()
+        content = {"event": event, "payload": {"user": user}}
+    else:
+        joined = [user for event, user in buffer.events.values() if event == "presence.join"]
+        left = [user for event, user in buffer.events.values() if event == "presence.leave"]
+        content = {"event": "presence.batch", "payload": {"joined": joined, "left": left}}
+    await buffer.channel_layer.group_send(group_name, encode_frame(content))
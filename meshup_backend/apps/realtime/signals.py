@@ -1,35 +1,54 @@
 """Signal handlers to broadcast realtime events via channel layer."""
 from __future__ import annotations
 
-from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
-from django.db.models.signals import post_save
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
-from apps.messages.models import DirectMessageMessage, Message
+from apps.channels.models import Channel
+from apps.messages.models import DirectMessage, DirectMessageMessage, Message
+from apps.servers.models import Server
 
-from .utils import serialize_dm_message_for_realtime, serialize_message_for_realtime
+from .broadcast import dispatch_group_send
+from .utils import (
+    channel_cache_key,
+    dm_participant_cache_key,
+    encode_frame,
+    serialize_dm_message_for_realtime,
+    serialize_new_message_for_realtime,
+    serialize_user_basic,
+)
+
+
+def _preload_reply_to(message: Message) -> None:
+    """Load a reply target together with its author in one query if it is not in memory yet."""
+
+    if message.reply_to_id and not (
+        Message.reply_to.is_cached(message) and Message.author.is_cached(message.reply_to)
+    ):
+        message.reply_to = Message.objects.select_related("author").get(pk=message.reply_to_id)
 
 
 @receiver(post_save, sender=Message)
 def broadcast_message_created(sender, instance: Message, created: bool, **kwargs):
     """Broadcast message creation events to websocket subscribers."""
 
-    if not created:
+    if not created or getattr(instance, "_from_websocket", False):
         return
 
     channel_layer = get_channel_layer()
     if channel_layer is None:
         return
 
-    payload = serialize_message_for_realtime(instance)
-    async_to_sync(channel_layer.group_send)(
+    # A row that was just inserted cannot have attachments or reactions yet, so the in-memory
+    # builder produces exactly what MessageSerializer would.
+    _preload_reply_to(instance)
+    payload = serialize_new_message_for_realtime(instance, author=serialize_user_basic(instance.author))
+    dispatch_group_send(
+        channel_layer,
         f"realtime.channel.{instance.channel_id}",
-        {
-            "type": "realtime.message",
-            "event": "message.created",
-            "payload": payload,
-        },
+        encode_frame({"event": "message.created", "payload": payload}),
     )
 
 
@@ -37,7 +56,7 @@ def broadcast_message_created(sender, instance: Message, created: bool, **kwargs
 def broadcast_dm_message_created(sender, instance: DirectMessageMessage, created: bool, **kwargs):
     """Broadcast direct message creation events to websocket subscribers."""
 
-    if not created:
+    if not created or getattr(instance, "_from_websocket", False):
         return
 
     channel_layer = get_channel_layer()
@@ -45,11 +64,42 @@ def broadcast_dm_message_created(sender, instance: DirectMessageMessage, created
         return
 
     payload = serialize_dm_message_for_realtime(instance)
-    async_to_sync(channel_layer.group_send)(
+    dispatch_group_send(
+        channel_layer,
         f"realtime.dm.{instance.dm_channel_id}",
-        {
-            "type": "realtime.message",
-            "event": "message.created",
-            "payload": payload,
-        },
+        encode_frame({"event": "message.created", "payload": payload}),
     )
+
+
+@receiver([post_save, post_delete], sender=Channel)
+def invalidate_channel_cache(sender, instance: Channel, **kwargs):
+    """Drop cached handshake metadata when a channel changes."""
+
+    cache.delete(channel_cache_key(instance.id))
+
+
+@receiver(post_save, sender=Server)
+def invalidate_server_channel_cache(sender, instance: Server, created: bool, update_fields=None, **kwargs):
+    """Drop cached channel metadata when a server may have changed owner."""
+
+    if created or (update_fields is not None and "owner" not in update_fields):
+        return
+    channel_ids = instance.channels.values_list("id", flat=True)
+    cache.delete_many([channel_cache_key(channel_id) for channel_id in channel_ids])
+
+
+@receiver(m2m_changed, sender=DirectMessage.participants.through)
+def invalidate_dm_participant_cache(sender, instance, action: str, reverse: bool, pk_set=None, **kwargs):
+    """Drop cached DM participant flags when participants are added or removed."""
+
+    if action not in {"post_add", "post_remove", "pre_clear"}:
+        return
+    if action == "pre_clear":
+        # pk_set is not provided for clears, so collect the affected side before it is emptied.
+        related = instance.dm_channels if reverse else instance.participants
+        pk_set = set(related.values_list("id", flat=True))
+    if reverse:
+        keys = [dm_participant_cache_key(dm_id, instance.id) for dm_id in pk_set]
+    else:
+        keys = [dm_participant_cache_key(instance.id, user_id) for user_id in pk_set]
+    cache.delete_many(keys)
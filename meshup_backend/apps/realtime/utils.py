@@ -1,36 +1,137 @@
 """Utility helpers for realtime features."""
 from __future__ import annotations
 
-import json
-from typing import Any, Dict
+from collections import namedtuple
+from typing import Any, Dict, List, Optional
 
+import msgpack
+import orjson
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 from apps.messages.models import DirectMessageMessage, Message
-from apps.messages.serializers import DirectMessageMessageSerializer, MessageSerializer
-from apps.users.serializers import UserBasicSerializer
 
 User = get_user_model()
 
+CHANNEL_CACHE_TIMEOUT = 300
+
+EncodedPayload = namedtuple("EncodedPayload", ("json", "msgpack"))
+
+_MSGPACK_EVENT_PREFIX = b"\x82" + msgpack.packb("event")
+_MSGPACK_PAYLOAD_KEY = msgpack.packb("payload")
+
+
+def channel_cache_key(channel_id) -> str:
+    """Cache key holding the ids a websocket handshake needs for a channel."""
+
+    return f"realtime:channel:{channel_id}"
+
+
+def dm_participant_cache_key(dm_id, user_id) -> str:
+    """Cache key holding whether a user participates in a direct message channel."""
+
+    return f"realtime:dm:{dm_id}:{user_id}"
+
+
+def encode_frame(content: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a ``realtime.frame`` group message with ``content`` encoded once per wire format."""
+
+    return {
+        "type": "realtime.frame",
+        "text": orjson.dumps(content).decode(),
+        "bytes": msgpack.packb(content),
+    }
+
+
+def encode_payload(payload: Any) -> EncodedPayload:
+    """Encode an event payload once per wire format so several frames can embed it."""
+
+    return EncodedPayload(orjson.dumps(payload), msgpack.packb(payload))
+
+
+def join_payloads(payloads: List[EncodedPayload]) -> EncodedPayload:
+    """Combine encoded payloads into one encoded list without decoding them."""
+
+    return EncodedPayload(
+        b"[" + b",".join(payload.json for payload in payloads) + b"]",
+        msgpack.Packer().pack_array_header(len(payloads)) + b"".join(payload.msgpack for payload in payloads),
+    )
+
+
+def encode_event_frame(event: str, payload: EncodedPayload) -> Dict[str, Any]:
+    """Build the same ``realtime.frame`` as ``encode_frame`` by splicing an already encoded payload."""
+
+    return {
+        "type": "realtime.frame",
+        "text": (b'{"event":' + orjson.dumps(event) + b',"payload":' + payload.json + b"}").decode(),
+        "bytes": _MSGPACK_EVENT_PREFIX + msgpack.packb(event) + _MSGPACK_PAYLOAD_KEY + payload.msgpack,
+    }
+
 
 def serialize_user_basic(user) -> Dict[str, Any]:
-    """Serialize user info for realtime payloads."""
+    """Serialize user info for realtime payloads in UserBasicSerializer's shape."""
+
+    return {
+        "id": str(user.id),
+        "username": user.username,
+        "discriminator": user.discriminator,
+        "status": user.status,
+        "avatar": user.avatar.url if user.avatar else None,
+    }
+
+
+def _format_datetime(value) -> Optional[str]:
+    """Render a datetime the way DRF's DateTimeField does."""
+
+    if value is None:
+        return None
+    text = timezone.localtime(value).isoformat()
+    if text.endswith("+00:00"):
+        text = text[:-6] + "Z"
+    return text
 
-    return UserBasicSerializer(user).data
 
+def serialize_new_message_for_realtime(message: Message, *, author: Dict[str, Any]) -> Dict[str, Any]:
+    """Serialize a just-built message into MessageSerializer's shape without touching the database.
 
-def serialize_message_for_realtime(message: Message) -> Dict[str, Any]:
-    """Serialize message model using existing serializer with minimal context."""
+    ``author`` is the already serialized author and ``reply_to`` must be loaded together with its
+    author, so the payload is built from in-memory attributes and is safe to call on the event loop.
+    """
 
-    serializer = MessageSerializer(message, context={"request": None})
-    data = serializer.data
-    # Ensure payload is JSON-serializable (convert UUIDs, datetimes, etc. to strings)
-    return json.loads(json.dumps(data, default=str))
+    reply_to = None
+    if message.reply_to_id:
+        reply = message.reply_to
+        reply_to = {
+            "id": str(reply.id),
+            "author": serialize_user_basic(reply.author),
+            "content": reply.content[:100],
+            "created_at": _format_datetime(reply.created_at),
+        }
+    return {
+        "id": str(message.id),
+        "channel": str(message.channel_id),
+        "author": author,
+        "content": message.content,
+        "message_type": message.message_type,
+        "reply_to": reply_to,
+        "thread_id": str(message.thread_id) if message.thread_id else None,
+        "is_pinned": message.is_pinned,
+        "is_edited": message.is_edited,
+        "attachments": [],
+        "reactions": [],
+        "created_at": _format_datetime(message.created_at),
+        "edited_at": _format_datetime(message.edited_at),
+    }
 
 
 def serialize_dm_message_for_realtime(dm_message: DirectMessageMessage) -> Dict[str, Any]:
-    """Serialize DM message payload using the existing serializer."""
+    """Serialize a DM message into DirectMessageMessageSerializer's shape from in-memory attributes."""
 
-    serializer = DirectMessageMessageSerializer(dm_message, context={"request": None})
-    data = serializer.data
-    return json.loads(json.dumps(data, default=str))
+    return {
+        "id": str(dm_message.id),
+        "dm_channel": str(dm_message.dm_channel_id),
+        "author": serialize_user_basic(dm_message.author),
+        "content": dm_message.content,
+        "is_read": dm_message.is_read,
+        "created_at": _format_datetime(dm_message.created_at),
+    }
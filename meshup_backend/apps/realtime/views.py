@@ -1,15 +1,113 @@
 """REST views exposing realtime documentation metadata."""
 from __future__ import annotations
 
+import hashlib
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+import orjson
 from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import permissions, status
-from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from .serializers import RealtimeMetadataResponseSerializer
 
+METADATA_CACHE_MAX_AGE = 3600
+
+
+@lru_cache(maxsize=8)
+def _metadata_json(swagger_api_base_url: str) -> Tuple[bytes, str]:
+    """Render the metadata payload and its ETag once per configured API base URL."""
+
+    body = orjson.dumps(_build_metadata(swagger_api_base_url))
+    return body, quote_etag(hashlib.md5(body).hexdigest())
+
+
+def _build_metadata(swagger_api_base_url: str) -> Dict[str, Any]:
+    base_ws_url = swagger_api_base_url.replace("http", "ws") if swagger_api_base_url.startswith("http") else "wss://flowdrix.tech/api/v1"
+    return {
+        "websocket_url": f"{base_ws_url.replace('/api/v1', '')}/ws/v1/realtime/servers/{{server_id}}/channels/{{channel_id}}/",
+        "authentication": "JWT access token passed as ?token=... or Authorization: Bearer header",
+        "events": [
+            {
+                "key": "message.send",
+                "description": "Client -> server. Broadcasts a new message to channel subscribers.",
+            },
+            {
+                "key": "message.created",
+                "description": "Server -> client. Emitted when a new message is persisted (REST or websocket).",
+            },
+            {
+                "key": "message.created.batch",
+                "description": "Server -> client. Several websocket messages sent within a few milliseconds; payload is a list of messages.",
+            },
+            {
+                "key": "typing.start",
+                "description": "Client -> server. Indicates the user started typing. Broadcast to channel members.",
+            },
+            {
+                "key": "typing.stop",
+                "description": "Client -> server. Indicates the user stopped typing. Broadcast to channel members.",
+            },
+            {
+                "key": "presence.join",
+                "description": "Server -> client. Published when a user joins the websocket channel.",
+            },
+            {
+                "key": "presence.leave",
+                "description": "Server -> client. Published when a user disconnects from the channel.",
+            },
+            {
+                "key": "presence.batch",
+                "description": "Server -> client. Several joins/leaves within one flush window, as `joined` and `left` user lists.",
+            },
+            {
+                "key": "presence.alive",
+                "description": "Server -> client. Heartbeat reply confirming the user is still connected.",
+            },
+        ],
+        "direct_message_websocket_url": f"{base_ws_url.replace('/api/v1', '')}/ws/v1/realtime/direct-messages/{{dm_id}}/",
+        "direct_message_events": [
+            {
+                "key": "message.send",
+                "description": "Client -> server. Persists a direct message and broadcasts it to participants.",
+            },
+            {
+                "key": "message.created",
+                "description": "Server -> client. Published when a DM message is saved (REST or websocket).",
+            },
+            {
+                "key": "typing.start",
+                "description": "Client -> server. Indicates the user started typing in the DM conversation.",
+            },
+            {
+                "key": "typing.stop",
+                "description": "Client -> server. Indicates the user stopped typing in the DM conversation.",
+            },
+            {
+                "key": "presence.join",
+                "description": "Server -> client. Participant joined the DM websocket stream.",
+            },
+            {
+                "key": "presence.leave",
+                "description": "Server -> client. Participant disconnected from the DM stream.",
+            },
+            {
+                "key": "presence.batch",
+                "description": "Server -> client. Several DM joins/leaves within one flush window, as `joined` and `left` lists.",
+            },
+            {
+                "key": "presence.alive",
+                "description": "Server -> client. DM heartbeat reply confirming the participant is still connected.",
+            },
+        ],
+    }
+
 
 class RealtimeMetadataView(APIView):
     """Provide metadata describing websocket endpoints and events."""
@@ -41,6 +139,10 @@ class RealtimeMetadataView(APIView):
                                 "key": "message.created",
                                 "description": "Server -> client. Emitted when a new message is persisted (REST or websocket).",
                             },
+                            {
+                                "key": "message.created.batch",
+                                "description": "Server -> client. Several websocket messages sent within a few milliseconds; payload is a list of messages.",
+                            },
                             {
                                 "key": "typing.start",
                                 "description": "Client -> server. Indicates the user started typing.",
@@ -57,6 +159,10 @@ class RealtimeMetadataView(APIView):
                                 "key": "presence.leave",
                                 "description": "Server -> client. User disconnected from the channel.",
                             },
+                            {
+                                "key": "presence.batch",
+                                "description": "Server -> client. Coalesced joins and leaves as `joined`/`left` user lists.",
+                            },
                             {
                                 "key": "presence.alive",
                                 "description": "Server -> client. Heartbeat acknowledgement reply.",
@@ -88,6 +194,10 @@ class RealtimeMetadataView(APIView):
                                 "key": "presence.leave",
                                 "description": "Server -> client. Participant disconnected from the DM stream.",
                             },
+                            {
+                                "key": "presence.batch",
+                                "description": "Server -> client. Coalesced DM joins and leaves as `joined`/`left` lists.",
+                            },
                             {
                                 "key": "presence.alive",
                                 "description": "Server -> client. Heartbeat reply for DM connections.",
@@ -100,70 +210,13 @@ class RealtimeMetadataView(APIView):
         tags=["Realtime"],
     )
     def get(self, request):
-        base_ws_url = settings.SWAGGER_API_BASE_URL.replace("http", "ws") if getattr(settings, "SWAGGER_API_BASE_URL", "").startswith("http") else "wss://flowdrix.tech/api/v1"
-        response_data = {
-            "websocket_url": f"{base_ws_url.replace('/api/v1', '')}/ws/v1/realtime/servers/{{server_id}}/channels/{{channel_id}}/",
-            "authentication": "JWT access token passed as ?token=... or Authorization: Bearer header",
-            "events": [
-                {
-                    "key": "message.send",
-                    "description": "Client -> server. Broadcasts a new message to channel subscribers.",
-                },
-                {
-                    "key": "message.created",
-                    "description": "Server -> client. Emitted when a new message is persisted (REST or websocket).",
-                },
-                {
-                    "key": "typing.start",
-                    "description": "Client -> server. Indicates the user started typing. Broadcast to channel members.",
-                },
-                {
-                    "key": "typing.stop",
-                    "description": "Client -> server. Indicates the user stopped typing. Broadcast to channel members.",
-                },
-                {
-                    "key": "presence.join",
-                    "description": "Server -> client. Published when a user joins the websocket channel.",
-                },
-                {
-                    "key": "presence.leave",
-                    "description": "Server -> client. Published when a user disconnects from the channel.",
-                },
-                {
-                    "key": "presence.alive",
-                    "description": "Server -> client. Heartbeat reply confirming the user is still connected.",
-                },
-            ],
-            "direct_message_websocket_url": f"{base_ws_url.replace('/api/v1', '')}/ws/v1/realtime/direct-messages/{{dm_id}}/",
-            "direct_message_events": [
-                {
-                    "key": "message.send",
-                    "description": "Client -> server. Persists a direct message and broadcasts it to participants.",
-                },
-                {
-                    "key": "message.created",
-                    "description": "Server -> client. Published when a DM message is saved (REST or websocket).",
-                },
-                {
-                    "key": "typing.start",
-                    "description": "Client -> server. Indicates the user started typing in the DM conversation.",
-                },
-                {
-                    "key": "typing.stop",
-                    "description": "Client -> server. Indicates the user stopped typing in the DM conversation.",
-                },
-                {
-                    "key": "presence.join",
-                    "description": "Server -> client. Participant joined the DM websocket stream.",
-                },
-                {
-                    "key": "presence.leave",
-                    "description": "Server -> client. Participant disconnected from the DM stream.",
-                },
-                {
-                    "key": "presence.alive",
-                    "description": "Server -> client. DM heartbeat reply confirming the participant is still connected.",
-                },
-            ],
-        }
-        return Response(response_data)
+        # The payload only depends on settings, so skip DRF rendering and serve pre-encoded bytes.
+        body, etag = _metadata_json(getattr(settings, "SWAGGER_API_BASE_URL", ""))
+        if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type="application/json")
+        response["ETag"] = etag
+        # Identical for every caller, so proxies may serve it without reaching Django.
+        patch_cache_control(response, public=True, max_age=METADATA_CACHE_MAX_AGE)
+        return response
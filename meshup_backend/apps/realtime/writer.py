@@ -0,0 +1,69 @@
+"""Write-behind queue that debounces websocket-originated DirectMessage timestamp bumps."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from asgiref.sync import sync_to_async
+from django.db import DatabaseError
+from django.db.models import Case, DateTimeField, Value, When
+
+from apps.messages.models import DirectMessage
+
+logger = logging.getLogger(__name__)
+
+DM_TIMESTAMP_FLUSH_INTERVAL = 0.5
+
+
+def _persist_dm_timestamps(pending: Dict[str, datetime]) -> None:
+    DirectMessage.objects.filter(id__in=pending).update(
+        last_message_at=Case(
+            *(When(id=dm_id, then=Value(sent_at)) for dm_id, sent_at in pending.items()),
+            output_field=DateTimeField(),
+        )
+    )
+
+
+class DirectMessageTimestampQueue:
+    """Debounce ``DirectMessage.last_message_at`` bumps into one UPDATE per flush window."""
+
+    def __init__(self, *, flush_interval: float = DM_TIMESTAMP_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, datetime] = {}
+        self._flush_now: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def touch(self, dm_id: str, sent_at: datetime) -> None:
+        loop = asyncio.get_running_loop()
+        previous = self._pending.get(dm_id)
+        if previous is None or sent_at > previous:
+            self._pending[dm_id] = sent_at
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._flush_now = asyncio.Event()
+            self._task = loop.create_task(self._run(self._flush_now))
+
+    async def drain(self) -> None:
+        """Flush pending timestamps on the current loop without waiting out the window."""
+
+        task = self._task
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            self._flush_now.set()
+            await asyncio.shield(task)
+
+    async def _run(self, flush_now: asyncio.Event) -> None:
+        while self._pending:
+            try:
+                await asyncio.wait_for(flush_now.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            flush_now.clear()
+            pending, self._pending = self._pending, {}
+            try:
+                await sync_to_async(_persist_dm_timestamps)(pending)
+            except DatabaseError:
+                logger.exception("Updating last_message_at for %s direct messages failed", len(pending))
+
+
+dm_timestamp_writer = DirectMessageTimestampQueue()
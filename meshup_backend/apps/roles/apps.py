@@ -8,3 +8,27 @@ class RolesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.roles"
     verbose_name = "Meshup Roles"
+
+    def ready(self) -> None:
+        from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
+
+        from .cache import forget_membership
+        from .models import Permission, Role, ServerMember
+        from .services import reset_default_permissions_cache
+        from .utils import reset_server_permission_memos
+
+        reset = reset_default_permissions_cache
+        post_save.connect(reset, sender=Permission, dispatch_uid="roles.default_permissions.saved")
+        post_delete.connect(reset, sender=Permission, dispatch_uid="roles.default_permissions.deleted")
+        post_migrate.connect(reset, sender=self, dispatch_uid="roles.default_permissions.migrated")
+
+        reset = reset_server_permission_memos
+        for sender in (Permission, Role, ServerMember):
+            post_save.connect(reset, sender=sender, dispatch_uid=f"roles.permission_memos.{sender.__name__}.saved")
+            post_delete.connect(reset, sender=sender, dispatch_uid=f"roles.permission_memos.{sender.__name__}.deleted")
+        for through in (ServerMember.roles.through, Role.permissions.through):
+            m2m_changed.connect(reset, sender=through, dispatch_uid=f"roles.permission_memos.{through.__name__}")
+
+        post_save.connect(forget_membership, sender=ServerMember, dispatch_uid="roles.membership_cache.saved")
+        post_delete.connect(forget_membership, sender=ServerMember, dispatch_uid="roles.membership_cache.deleted")
+        return super().ready()
@@ -0,0 +1,28 @@
+"""Cached server membership answers shared by the REST views and websocket consumers."""
+from __future__ import annotations
+
+from typing import Iterable, Tuple
+
+from django.core.cache import cache
+
+MEMBERSHIP_CACHE_TIMEOUT = 60
+
+
+def membership_cache_key(server_id, user_id) -> str:
+    """Cache key holding whether a user is an active member of a server."""
+
+    return f"roles:member:{server_id}:{user_id}"
+
+
+def forget_memberships(pairs: Iterable[Tuple[object, object]]) -> None:
+    """Drop cached membership flags for the given ``(server_id, user_id)`` pairs."""
+
+    keys = [membership_cache_key(server_id, user_id) for server_id, user_id in pairs]
+    if keys:
+        cache.delete_many(keys)
+
+
+def forget_membership(sender, instance, **kwargs) -> None:
+    """Signal receiver dropping the cached flag of a saved or deleted ServerMember."""
+
+    forget_memberships([(instance.server_id, instance.user_id)])
@@ -1,8 +1,14 @@
 """Role and permission models for Meshup RBAC."""
 import uuid
+from collections import Counter
 
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models import Count, F, OuterRef, Subquery, sql
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .cache import forget_memberships
 
 
 class Permission(models.Model):
@@ -74,9 +80,79 @@ class Role(models.Model):
     def __str__(self) -> str:
         return f"{self.name} ({self.server.name})"
 
+    @cached_property
+    def permission_codenames(self) -> frozenset:
+        """Codenames granted by this role, read from prefetched permissions when available."""
+        if "permissions" in getattr(self, "_prefetched_objects_cache", {}):
+            return frozenset(permission.codename for permission in self.permissions.all())
+        return frozenset(self.permissions.values_list("codename", flat=True))
+
     def has_permission(self, permission_codename: str) -> bool:
         """Check if role has specific permission."""
-        return self.permissions.filter(codename=permission_codename).exists()
+        return permission_codename in self.permission_codenames
+
+
+class ServerMemberQuerySet(models.QuerySet):
+    """Keep cached membership answers in step with bulk writes, which skip model signals."""
+
+    # Only these columns feed the membership cache and the memoised permission sets.
+    ACCESS_FIELDS = frozenset({"is_banned", "is_owner"})
+
+    def update(self, **kwargs):
+        if self.ACCESS_FIELDS.isdisjoint(kwargs):
+            return super().update(**kwargs)
+
+        from .utils import reset_server_permission_memos
+
+        pairs = self._update_returning_memberships(kwargs)
+        forget_memberships(pairs)
+        reset_server_permission_memos()
+        return len(pairs)
+
+    def _update_returning_memberships(self, values):
+        """Run the UPDATE and return the ``(server_id, user_id)`` pairs of the rows it changed."""
+        connection = connections[self.db]
+        if self.query.is_sliced or not connection.features.can_return_columns_from_insert:
+            # No RETURNING on this backend: lock the rows so the pairs read are exactly the ones updated.
+            with transaction.atomic(using=self.db):
+                pairs = list(self.select_for_update().values_list("server_id", "user_id"))
+                super().update(**values)
+            return pairs
+
+        query = self.query.chain(sql.UpdateQuery)
+        query.add_update_values(values)
+        query.annotations = {}
+        compiler = query.get_compiler(self.db)
+        compiler.pre_sql_setup()
+        update_sql, params = compiler.as_sql()
+        fields = [self.model._meta.get_field("server"), self.model._meta.get_field("user")]
+        returning = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+        with transaction.mark_for_rollback_on_error(using=self.db), connection.cursor() as cursor:
+            cursor.execute(f"{update_sql} RETURNING {returning}", params)
+            rows = cursor.fetchall()
+        return [tuple(field.to_python(value) for field, value in zip(fields, row)) for row in rows]
+
+    def bulk_create(self, objs, batch_size=None, ignore_conflicts=False, **kwargs):
+        from .utils import reset_server_permission_memos
+
+        created = super().bulk_create(objs, batch_size=batch_size, ignore_conflicts=ignore_conflicts, **kwargs)
+        forget_memberships((member.server_id, member.user_id) for member in created)
+        reset_server_permission_memos()
+        self._count_new_members(created, recount=ignore_conflicts or kwargs.get("update_conflicts", False))
+        return created
+
+    def _count_new_members(self, members, *, recount: bool) -> None:
+        # Mirrors the post_save receiver in apps.servers.signals, which bulk inserts skip.
+        server_model = self.model._meta.get_field("server").related_model
+        if recount:
+            # Rows skipped as conflicts are not reported back, so count the stored memberships instead.
+            member_count = self.model.objects.filter(server=OuterRef("pk")).order_by().values("server")
+            server_model.objects.filter(pk__in={member.server_id for member in members}).update(
+                member_count=Coalesce(Subquery(member_count.annotate(c=Count("pk")).values("c")), 0)
+            )
+            return
+        for server_id, added in Counter(member.server_id for member in members).items():
+            server_model.objects.filter(pk=server_id).update(member_count=F("member_count") + added)
 
 
 class ServerMember(models.Model):
@@ -96,6 +172,8 @@ class ServerMember(models.Model):
     joined_at = models.DateTimeField(default=timezone.now)
     last_seen = models.DateTimeField(auto_now=True)
 
+    objects = ServerMemberQuerySet.as_manager()
+
     class Meta:
         db_table = "server_members"
         unique_together = [["user", "server"]]
@@ -108,8 +186,17 @@ class ServerMember(models.Model):
     def __str__(self) -> str:
         return f"{self.user.username} in {self.server.name}"
 
+    @cached_property
+    def permission_codenames(self) -> frozenset:
+        """Codenames granted through all assigned roles, read from prefetched roles when available."""
+        if "roles" in getattr(self, "_prefetched_objects_cache", {}):
+            return frozenset().union(*(role.permission_codenames for role in self.roles.all()))
+        return frozenset(
+            Permission.objects.filter(roles__members=self).values_list("codename", flat=True).distinct()
+        )
+
     def has_permission(self, permission_codename: str) -> bool:
         """Check if member has specific permission through any assigned role."""
         if self.is_owner:
             return True
-        return self.roles.filter(permissions__codename=permission_codename).exists()
+        return permission_codename in self.permission_codenames
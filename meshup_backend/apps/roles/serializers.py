@@ -1,4 +1,5 @@
 """Serializers for role and permission management."""
+from drf_yasg.utils import swagger_serializer_method
 from rest_framework import serializers
 
 from .models import Permission, Role, ServerMember
@@ -16,7 +17,7 @@ class PermissionSerializer(serializers.ModelSerializer):
 class RoleSerializer(serializers.ModelSerializer):
     """Serialize a role and its associated permissions."""
 
-    permissions = PermissionSerializer(many=True, read_only=True)
+    permissions = serializers.SerializerMethodField()
 
     class Meta:
         model = Role
@@ -32,6 +33,21 @@ class RoleSerializer(serializers.ModelSerializer):
         )
         read_only_fields = fields
 
+    @swagger_serializer_method(serializer_or_field=PermissionSerializer(many=True))
+    def get_permissions(self, obj):
+        """Render permissions in PermissionSerializer's shape; callers should prefetch them."""
+        return [
+            {
+                "id": str(permission.id),
+                "name": permission.name,
+                "codename": permission.codename,
+                "description": permission.description,
+                "category": permission.category,
+                "is_dangerous": permission.is_dangerous,
+            }
+            for permission in obj.permissions.all()
+        ]
+
 
 class ServerMemberRoleUpdateSerializer(serializers.Serializer):
     """Serializer for assigning roles to server members."""
@@ -44,16 +60,14 @@ class ServerMemberRoleUpdateSerializer(serializers.Serializer):
 
     def validate_role_ids(self, value):
         server = self.context["server"]
-        available_role_ids = set(str(role_id) for role_id in server.roles.values_list("id", flat=True))
-        requested_ids = [str(role_id) for role_id in value]
-        missing = [role_id for role_id in requested_ids if role_id not in available_role_ids]
-        if missing:
+        # Load only the requested roles; save() reuses them instead of querying again.
+        self._roles = list(server.roles.filter(id__in=value))
+        found_ids = {role.id for role in self._roles}
+        if any(role_id not in found_ids for role_id in value):
             raise serializers.ValidationError("One or more roles do not belong to this server.")
         return value
 
     def save(self, **kwargs):
         member: ServerMember = kwargs["member"]
-        role_ids = self.validated_data["role_ids"]
-        roles = member.server.roles.filter(id__in=role_ids)
-        member.roles.set(roles)
+        member.roles.set(self._roles)
         return member
@@ -1,7 +1,7 @@
 """Role-related services for Meshup."""
 from __future__ import annotations
 
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Optional
 
 from django.db import transaction
 
@@ -9,45 +9,104 @@ from .constants import DEFAULT_PERMISSION_DEFINITIONS, DEFAULT_ROLE_DEFINITIONS
 from .models import Permission, Role, ServerMember
 
 
-@transaction.atomic
+_default_permissions: Optional[Dict[str, Permission]] = None
+
+
 def ensure_default_permissions() -> Dict[str, Permission]:
     """Ensure that the core permission set exists and return them keyed by codename."""
-    permission_map: Dict[str, Permission] = {}
-    for definition in DEFAULT_PERMISSION_DEFINITIONS:
-        permission, _created = Permission.objects.get_or_create(
-            codename=definition["codename"],
-            defaults={
-                "name": definition["name"],
-                "description": definition["description"],
-                "category": definition["category"],
-                "is_dangerous": definition["is_dangerous"],
-            },
-        )
-        permission_map[permission.codename] = permission
+    if _default_permissions is not None:
+        return _default_permissions
+    return _create_default_permissions()
+
+
+@transaction.atomic
+def _create_default_permissions() -> Dict[str, Permission]:
+    Permission.objects.bulk_create(
+        [
+            Permission(
+                codename=definition.codename,
+                name=definition.name,
+                description=definition.description,
+                category=definition.category,
+                is_dangerous=definition.is_dangerous,
+            )
+            for definition in DEFAULT_PERMISSION_DEFINITIONS
+        ],
+        ignore_conflicts=True,
+    )
+    codenames = [definition.codename for definition in DEFAULT_PERMISSION_DEFINITIONS]
+    permission_map = {
+        permission.codename: permission for permission in Permission.objects.filter(codename__in=codenames)
+    }
+    # Only remember rows once they are committed; a rolled back transaction must not leave stale objects.
+    transaction.on_commit(lambda: _remember_default_permissions(permission_map))
     return permission_map
 
 
+def _remember_default_permissions(permission_map: Dict[str, Permission]) -> None:
+    global _default_permissions
+    _default_permissions = permission_map
+
+
+def reset_default_permissions_cache(**kwargs) -> None:
+    """Forget the memoised default permissions, e.g. after permission rows change."""
+    global _default_permissions
+    _default_permissions = None
+
+
 @transaction.atomic
 def ensure_default_roles(server) -> Dict[str, Role]:
     """Ensure that each server receives the default role hierarchy with permissions."""
     permissions = ensure_default_permissions()
+    role_types = [definition.role_type for definition in DEFAULT_ROLE_DEFINITIONS.values()]
+    existing = {
+        role.role_type: role
+        for role in server.roles.filter(role_type__in=role_types).prefetch_related("permissions")
+    }
+
     role_map: Dict[str, Role] = {}
+    new_roles: List[Role] = []
+    needs_permissions: List[Role] = []
     for key, definition in DEFAULT_ROLE_DEFINITIONS.items():
-        role, created = Role.objects.get_or_create(
-            server=server,
-            role_type=definition.role_type,
-            defaults={
-                "name": definition.name,
-                "color": definition.color,
-                "is_mentionable": definition.is_mentionable,
-                "is_hoisted": definition.is_hoisted,
-                "position": definition.position,
-            },
-        )
-        if created or role.permissions.count() == 0:
-            permission_objects = [permissions[codename] for codename in definition.permissions]
-            role.permissions.set(permission_objects)
+        role = existing.get(definition.role_type)
+        if role is None:
+            role = Role(
+                server=server,
+                role_type=definition.role_type,
+                name=definition.name,
+                color=definition.color,
+                is_mentionable=definition.is_mentionable,
+                is_hoisted=definition.is_hoisted,
+                position=definition.position,
+            )
+            new_roles.append(role)
+            needs_permissions.append(role)
+        elif not role.permissions.all():
+            needs_permissions.append(role)
+            # Drop the empty prefetch so callers do not read stale permissions.
+            role._prefetched_objects_cache.pop("permissions", None)
         role_map[key] = role
+
+    if new_roles:
+        # A concurrent call (e.g. a double-submitted server create) may insert the same roles first;
+        # skip those rows and read back what is stored so every id below refers to a real role.
+        Role.objects.bulk_create(new_roles, ignore_conflicts=True)
+        stored = {
+            role.role_type: role
+            for role in server.roles.filter(role_type__in=[role.role_type for role in new_roles])
+        }
+        role_map = {key: stored.get(role.role_type, role) for key, role in role_map.items()}
+        needs_permissions = [stored.get(role.role_type, role) for role in needs_permissions]
+
+    definitions_by_type = {definition.role_type: definition for definition in DEFAULT_ROLE_DEFINITIONS.values()}
+    Role.permissions.through.objects.bulk_create(
+        [
+            Role.permissions.through(role_id=role.id, permission_id=permissions[codename].id)
+            for role in needs_permissions
+            for codename in definitions_by_type[role.role_type].permissions
+        ],
+        ignore_conflicts=True,
+    )
     return role_map
 
 
@@ -81,4 +140,4 @@ def set_member_roles(membership: ServerMember, roles: Iterable[Role]) -> None:
 
 def list_roles_for_server(server) -> List[Role]:
     """Return all roles associated with a server ordered by position."""
-    return server.roles.order_by("-position", "name")
+    return server.roles.order_by("-position", "name").prefetch_related("permissions")
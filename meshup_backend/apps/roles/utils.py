@@ -3,12 +3,15 @@ from __future__ import annotations
 
 from typing import Optional
 
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Prefetch
 
 from apps.servers.models import Server
 
+from .cache import MEMBERSHIP_CACHE_TIMEOUT, membership_cache_key
 from .constants import ServerPermission
-from .models import ServerMember
+from .models import Permission, Role, ServerMember
 
 
 def get_server_member(user, server: Server) -> Optional[ServerMember]:
@@ -16,14 +19,48 @@ def get_server_member(user, server: Server) -> Optional[ServerMember]:
     if not user.is_authenticated:
         return None
     try:
-        return ServerMember.objects.select_related("server", "user").prefetch_related("roles__permissions").get(
-            user=user,
-            server=server,
+        return (
+            ServerMember.objects.select_related("server", "user")
+            .only("id", "is_owner", "is_banned", "server__id", "server__owner", "user__id")
+            .prefetch_related(
+                Prefetch(
+                    "roles",
+                    queryset=Role.objects.only("id").prefetch_related(
+                        Prefetch("permissions", queryset=Permission.objects.only("id", "codename"))
+                    ),
+                )
+            )
+            .get(user=user, server=server)
         )
     except ObjectDoesNotExist:
         return None
 
 
+def user_is_server_member(user, server_id) -> bool:
+    """Return whether the user is an active member of the server, cached across requests.
+
+    Shares the websocket consumers' cache entry. ServerMember save/delete signals and the
+    ServerMember queryset's ``update``/``bulk_create`` drop it, so every ban or join path stays covered.
+    """
+    key = membership_cache_key(server_id, user.id)
+    is_member = cache.get(key)
+    if is_member is None:
+        is_member = ServerMember.objects.filter(server_id=server_id, user=user, is_banned=False).exists()
+        cache.set(key, is_member, MEMBERSHIP_CACHE_TIMEOUT)
+    return is_member
+
+
+_permission_generation = 0
+# Memoised for owner memberships: owners hold every permission, including codenames without a row.
+_ALL_PERMISSIONS = object()
+
+
+def reset_server_permission_memos(**kwargs) -> None:
+    """Discard permission sets memoised on users, e.g. after roles or memberships change."""
+    global _permission_generation
+    _permission_generation += 1
+
+
 def user_has_server_permission(user, server: Server, permission_codename: str) -> bool:
     """Check whether a user may perform the requested action within the server."""
     if not user.is_authenticated:
@@ -33,12 +70,23 @@ def user_has_server_permission(user, server: Server, permission_codename: str) -
     if server.owner_id == getattr(user, "id", None):
         return True
 
-    membership = get_server_member(user, server)
-    if not membership or membership.is_banned:
-        return False
-    if membership.is_owner:
-        return True
-    return membership.has_permission(permission_codename)
+    # request.user is loaded per request, so permission sets cached on it live at most as long as the request.
+    # Role, membership and permission changes bump the generation, which discards sets memoised before them.
+    memo = getattr(user, "_server_permission_cache", None)
+    if memo is None or memo[0] != _permission_generation:
+        memo = user._server_permission_cache = (_permission_generation, {})
+    permission_sets = memo[1]
+    if server.pk not in permission_sets:
+        # Membership and role codenames in one query: one row per granted codename (None without roles).
+        rows = ServerMember.objects.filter(user=user, server=server, is_banned=False).values_list(
+            "is_owner", "roles__permissions__codename"
+        )
+        if any(is_owner for is_owner, _ in rows):
+            permission_sets[server.pk] = _ALL_PERMISSIONS
+        else:
+            permission_sets[server.pk] = frozenset(codename for _, codename in rows if codename)
+    granted = permission_sets[server.pk]
+    return granted is _ALL_PERMISSIONS or permission_codename in granted
 
 
 def require_server_permission(user, server: Server, permission_codename: str):
@@ -52,6 +100,8 @@ def require_server_permission(user, server: Server, permission_codename: str):
 __all__ = [
     "ServerPermission",
     "get_server_member",
+    "user_is_server_member",
     "user_has_server_permission",
+    "reset_server_permission_memos",
     "require_server_permission",
 ]
@@ -8,3 +8,8 @@ class ServersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.servers"
     verbose_name = "Meshup Servers"
+
+    def ready(self) -> None:  # pragma: no cover - import for side effects only
+        from . import signals  # noqa: F401
+
+        return super().ready()
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-15 23:04
+
+import base64
+import secrets
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+def _random_code(length):
+    return base64.b32encode(secrets.token_bytes((length * 5 + 7) // 8)).decode("ascii")[:length]
+
+
+def uppercase_invite_codes(apps, schema_editor):
+    ServerInvite = apps.get_model("servers", "ServerInvite")
+    upper = django.db.models.functions.text.Upper("code")
+    # Codes that are already upper-case keep their value; mixed-case codes that would collide
+    # with them or with each other once upper-cased (e.g. "abCD" and "ABcd") get a fresh code.
+    taken = set(ServerInvite.objects.filter(code=upper).values_list("code", flat=True))
+    for invite in ServerInvite.objects.exclude(code=upper).order_by("created_at").only("id", "code"):
+        code = invite.code.upper()
+        while code in taken:
+            code = _random_code(max(len(invite.code), 8))
+        taken.add(code)
+        ServerInvite.objects.filter(pk=invite.pk).update(code=code)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("servers", "0005_alter_server_region"),
+    ]
+
+    operations = [
+        migrations.RunPython(uppercase_invite_codes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="serverinvite",
+            constraint=models.CheckConstraint(
+                check=models.Q(("code", django.db.models.functions.text.Upper("code"))),
+                name="server_invite_code_upper",
+            ),
+        ),
+    ]
@@ -1,10 +1,11 @@
 """Server and channel models for Meshup."""
+import base64
 import secrets
-import string
 import uuid
 
 from django.conf import settings
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils import timezone
 
 
@@ -74,22 +75,43 @@ class ServerInvite(models.Model):
             models.Index(fields=["server", "created_at"]),
             models.Index(fields=["code"]),
         ]
+        constraints = [
+            # Codes are redeemed by exact match on the upper-cased input, so they must be stored upper-cased.
+            models.CheckConstraint(check=models.Q(code=Upper("code")), name="server_invite_code_upper"),
+        ]
 
     def __str__(self) -> str:
         return f"Invite {self.code} -> {self.server.name}"
 
+    def save(self, *args, **kwargs):
+        self.code = self.code.strip().upper()
+        super().save(*args, **kwargs)
+
     @classmethod
     def generate_code(cls, length: int = 10) -> str:
         """Generate a unique invite code."""
 
-        alphabet = string.ascii_uppercase + string.digits
-        for _ in range(8):
-            candidate = "".join(secrets.choice(alphabet) for _ in range(length))
-            if not cls.objects.filter(code=candidate).exists():
+        # Base32 of one random draw per candidate; the A-Z2-7 alphabet keeps codes upper-cased.
+        size = (length * 5 + 7) // 8
+        candidates = [base64.b32encode(secrets.token_bytes(size)).decode("ascii")[:length] for _ in range(8)]
+        # One IN lookup rules out collisions for every candidate at once.
+        taken = set(cls.objects.filter(code__in=candidates).values_list("code", flat=True))
+        for candidate in candidates:
+            if candidate not in taken:
                 return candidate
         # Fallback to UUID hex to avoid collisions in extreme cases
         return uuid.uuid4().hex[: length].upper()
 
+    @staticmethod
+    def active_condition(now) -> models.Q:
+        """SQL counterpart of ``is_active`` for annotating or filtering querysets."""
+
+        return (
+            models.Q(revoked_at__isnull=True)
+            & (models.Q(expires_at__isnull=True) | models.Q(expires_at__gte=now))
+            & (models.Q(max_uses__isnull=True) | models.Q(uses__lt=models.F("max_uses")))
+        )
+
     def is_active(self) -> bool:
         """Return True if invite can still be redeemed."""
 
@@ -1,5 +1,6 @@
 """Serializers for servers and workspaces."""
 from django.utils import timezone
+from drf_yasg.utils import swagger_serializer_method
 from rest_framework import serializers
 
 from apps.users.serializers import UserBasicSerializer
@@ -10,7 +11,7 @@ from .models import Server, ServerInvite
 class ServerSerializer(serializers.ModelSerializer):
     """Serializer for server details."""
 
-    owner = UserBasicSerializer(read_only=True)
+    owner = serializers.SerializerMethodField()
 
     class Meta:
         model = Server
@@ -30,6 +31,14 @@ class ServerSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ("id", "owner", "created_at", "updated_at", "member_count")
 
+    @swagger_serializer_method(serializer_or_field=UserBasicSerializer)
+    def get_owner(self, obj: Server):
+        """Serialize each owner once per response; list pages often repeat the same owner."""
+        owners = self.context.setdefault("_server_owner_cache", {})
+        if obj.owner_id not in owners:
+            owners[obj.owner_id] = UserBasicSerializer(obj.owner, context=self.context).data
+        return owners[obj.owner_id]
+
 
 class ServerCreateUpdateSerializer(serializers.ModelSerializer):
     """Serializer for creating or updating servers."""
@@ -74,7 +83,45 @@ class ServerInviteSerializer(serializers.ModelSerializer):
         )
 
     def get_is_active(self, obj: ServerInvite) -> bool:
-        return obj.is_active()
+        active = getattr(obj, "active", None)
+        return obj.is_active() if active is None else active
+
+
+_invite_datetime = serializers.DateTimeField()
+
+
+def _format_datetime(value):
+    return _invite_datetime.to_representation(value) if value is not None else None
+
+
+def serialize_server_invites(invites, *, server_data, context) -> list:
+    """Render one server's invites in ServerInviteSerializer's shape without a serializer per row.
+
+    ``server_data`` is the already serialized server shared by every invite; inviters are serialized once each.
+    """
+    inviters = {}
+    results = []
+    for invite in invites:
+        if invite.inviter_id is not None and invite.inviter_id not in inviters:
+            inviters[invite.inviter_id] = UserBasicSerializer(invite.inviter, context=context).data
+        active = getattr(invite, "active", None)
+        results.append(
+            {
+                "id": str(invite.id),
+                "code": invite.code,
+                "server": server_data,
+                "inviter": inviters.get(invite.inviter_id),
+                "label": invite.label,
+                "invitee_email": invite.invitee_email,
+                "max_uses": invite.max_uses,
+                "uses": invite.uses,
+                "expires_at": _format_datetime(invite.expires_at),
+                "revoked_at": _format_datetime(invite.revoked_at),
+                "created_at": _format_datetime(invite.created_at),
+                "is_active": invite.is_active() if active is None else active,
+            }
+        )
+    return results
 
 
 class ServerInviteCreateSerializer(serializers.ModelSerializer):
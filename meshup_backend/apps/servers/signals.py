@@ -0,0 +1,35 @@
+"""Signal handlers keeping denormalised server data in step with memberships.
+
+Bulk inserts skip these signals; ServerMemberQuerySet.bulk_create adjusts member_count itself.
+"""
+from __future__ import annotations
+
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.roles.models import ServerMember
+
+from .models import Server
+
+
+def _adjust_member_count(instance: ServerMember, delta: int) -> None:
+    Server.objects.filter(pk=instance.server_id).update(member_count=F("member_count") + delta)
+    # Keep a server instance the caller already holds in step, so responses show the new count.
+    if ServerMember.server.is_cached(instance):
+        instance.server.member_count += delta
+
+
+@receiver(post_save, sender=ServerMember)
+def increment_member_count(sender, instance: ServerMember, created: bool, raw: bool = False, **kwargs):
+    """Count a new membership on its server."""
+
+    if created and not raw:
+        _adjust_member_count(instance, 1)
+
+
+@receiver(post_delete, sender=ServerMember)
+def decrement_member_count(sender, instance: ServerMember, **kwargs):
+    """Uncount a removed membership from its server."""
+
+    _adjust_member_count(instance, -1)
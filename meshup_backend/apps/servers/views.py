@@ -1,8 +1,9 @@
 """Views for server management."""
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import BooleanField, ExpressionWrapper, Q
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from drf_yasg.utils import swagger_auto_schema
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.decorators import action
@@ -18,6 +19,7 @@ from apps.roles.services import (
     list_roles_for_server,
 )
 from apps.roles.utils import get_server_member, require_server_permission
+from apps.users.serializers import user_basic_fields
 
 from .models import Server, ServerInvite
 from .serializers import (
@@ -26,6 +28,7 @@ from .serializers import (
     ServerInviteCreateSerializer,
     ServerInviteSerializer,
     ServerSerializer,
+    serialize_server_invites,
 )
 
 
@@ -47,9 +50,12 @@ class ServerViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         queryset = super().get_queryset()
         if self.action == "list":
-            return queryset.filter(
-                Q(is_public=True) | Q(owner=self.request.user) | Q(members__user=self.request.user)
-            ).distinct()
+            # A membership subquery instead of a join keeps one row per server, so no DISTINCT is needed.
+            member_of = ServerMember.objects.filter(user=self.request.user).values("server_id")
+            return queryset.filter(Q(is_public=True) | Q(owner=self.request.user) | Q(pk__in=member_of)).only(
+                *(field for field in ServerSerializer.Meta.fields if field != "owner"),
+                *user_basic_fields("owner"),
+            )
         return queryset
 
     def update(self, request, *args, **kwargs):  # type: ignore[override]
@@ -63,21 +69,20 @@ class ServerViewSet(viewsets.ModelViewSet):
         return super().partial_update(request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        server = serializer.save(owner=self.request.user)
-        role_map = ensure_default_roles(server)
-        membership = ServerMember.objects.create(user=self.request.user, server=server, is_owner=True)
-        assign_admin_role(membership, role_map)
-        server.member_count = ServerMember.objects.filter(server=server).count()
-        server.save(update_fields=["member_count"])
+        # One transaction for the server, its default roles and the owner's membership.
+        with transaction.atomic():
+            server = serializer.save(owner=self.request.user)
+            role_map = ensure_default_roles(server)
+            membership = ServerMember.objects.create(user=self.request.user, server=server, is_owner=True)
+            assign_admin_role(membership, role_map)
         return server
 
     def create(self, request, *args, **kwargs):  # type: ignore[override]
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         server = self.perform_create(serializer)
-        headers = self.get_success_headers(serializer.data)
-        output = ServerSerializer(server, context={"request": request})
-        return Response(output.data, status=status.HTTP_201_CREATED, headers=headers)
+        data = ServerSerializer(server, context={"request": request}).data
+        return Response(data, status=status.HTTP_201_CREATED, headers=self.get_success_headers(data))
 
     def destroy(self, request, *args, **kwargs):  # type: ignore[override]
         server = self.get_object()
@@ -87,15 +92,12 @@ class ServerViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["post"])
     def join(self, request, pk=None):
         server = self.get_object()
-        membership = ServerMember.objects.filter(user=request.user, server=server).first()
-        if membership:
+        membership, created = ServerMember.objects.get_or_create(user=request.user, server=server)
+        if not created:
             if membership.is_banned:
                 return Response({"error": "You are banned from this server."}, status=status.HTTP_403_FORBIDDEN)
             return Response({"message": "Already a member"})
-        membership = ServerMember.objects.create(user=request.user, server=server)
         assign_default_member_role(membership)
-        server.member_count = ServerMember.objects.filter(server=server).count()
-        server.save(update_fields=["member_count"])
         return Response({"message": "Joined server successfully"})
 
     @action(detail=True, methods=["post"])
@@ -107,10 +109,9 @@ class ServerViewSet(viewsets.ModelViewSet):
         if membership.is_owner:
             return Response({"error": "Owner cannot leave their own server"}, status=status.HTTP_400_BAD_REQUEST)
         membership.delete()
-        server.member_count = ServerMember.objects.filter(server=server).count()
-        server.save(update_fields=["member_count"])
         return Response({"message": "Left server successfully"})
 
+    @swagger_auto_schema(responses={status.HTTP_200_OK: RoleSerializer(many=True)})
     @action(detail=True, methods=["get"], url_path="roles")
     def list_roles(self, request, pk=None):
         server = self.get_object()
@@ -135,9 +136,9 @@ class ServerViewSet(viewsets.ModelViewSet):
         serializer = ServerMemberRoleUpdateSerializer(data=request.data, context={"server": server})
         serializer.is_valid(raise_exception=True)
         serializer.save(member=member)
-        if member.roles.count() == 0:
+        if not member.roles.exists():
             assign_default_member_role(member)
-        response = RoleSerializer(member.roles.all(), many=True)
+        response = RoleSerializer(member.roles.prefetch_related("permissions"), many=True)
         return Response({"message": "Roles updated successfully", "roles": response.data})
 
     @action(detail=True, methods=["get"], url_path="invites")
@@ -146,9 +147,11 @@ class ServerViewSet(viewsets.ModelViewSet):
 
         server = self.get_object()
         require_server_permission(request.user, server, ServerPermission.MANAGE_MEMBERS)
-        invites = server.invites.order_by("-created_at")
-        serializer = ServerInviteSerializer(invites, many=True, context={"request": request})
-        return Response(serializer.data)
+        active = ExpressionWrapper(ServerInvite.active_condition(timezone.now()), output_field=BooleanField())
+        invites = server.invites.select_related("inviter").annotate(active=active).order_by("-created_at")
+        context = {"request": request}
+        server_data = ServerSerializer(server, context=context).data
+        return Response(serialize_server_invites(invites, server_data=server_data, context=context))
 
     @list_invites.mapping.post
     def create_invite(self, request, pk=None):
@@ -187,14 +190,18 @@ class ServerViewSet(viewsets.ModelViewSet):
         serializer = ServerInviteAcceptSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         code = serializer.validated_data["code"].strip().upper()
-        invite = ServerInvite.objects.filter(code=code).select_related("server").first()
+        try:
+            invite = ServerInvite.objects.select_related("server__owner", "inviter").get(code=code)
+        except ServerInvite.DoesNotExist:
+            invite = None
         if not invite or not invite.is_active():
             return Response({"detail": "Invite is invalid or expired."}, status=status.HTTP_400_BAD_REQUEST)
 
         server = invite.server
         with transaction.atomic():
-            membership = ServerMember.objects.filter(user=request.user, server=server).select_for_update().first()
-            if membership:
+            # The (user, server) unique constraint settles concurrent accepts; no row lock is needed.
+            membership, created = ServerMember.objects.get_or_create(user=request.user, server=server)
+            if not created:
                 if membership.is_banned:
                     return Response({"detail": "You are banned from this server."}, status=status.HTTP_403_FORBIDDEN)
                 return Response(
@@ -204,16 +211,12 @@ class ServerViewSet(viewsets.ModelViewSet):
                     }
                 )
 
-            membership = ServerMember.objects.create(user=request.user, server=server)
             assign_default_member_role(membership)
             invite.mark_used()
             invite.save(update_fields=["uses", "revoked_at"])
-            server.member_count = ServerMember.objects.filter(server=server).count()
-            server.save(update_fields=["member_count"])
-
-        output = {
-            "message": "Joined server successfully",
-            "server": ServerSerializer(server, context={"request": request}).data,
-            "invite": ServerInviteSerializer(invite, context={"request": request}).data,
-        }
+
+        context = {"request": request}
+        server_data = ServerSerializer(server, context=context).data
+        (invite_data,) = serialize_server_invites([invite], server_data=server_data, context=context)
+        output = {"message": "Joined server successfully", "server": server_data, "invite": invite_data}
         return Response(output, status=status.HTTP_200_OK)
@@ -1,10 +1,12 @@
 """Serializers for Meshup settings."""
 from rest_framework import serializers
 
+from config.serializers import CachedFieldsMixin
+
 from .models import NotificationPreference, ServerSettings, UserSettings
 
 
-class UserSettingsSerializer(serializers.ModelSerializer):
+class UserSettingsSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for user settings."""
 
     class Meta:
@@ -33,7 +35,7 @@ class UserSettingsSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "updated_at")
 
 
-class ServerSettingsSerializer(serializers.ModelSerializer):
+class ServerSettingsSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for server settings."""
 
     class Meta:
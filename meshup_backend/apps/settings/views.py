@@ -5,7 +5,7 @@ from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 
 from apps.servers.models import Server
-from apps.roles.models import ServerMember
+from apps.roles.utils import user_is_server_member
 
 from .models import NotificationPreference, ServerSettings, UserSettings
 from .serializers import (
@@ -25,8 +25,13 @@ class UserSettingsViewSet(viewsets.ModelViewSet):
         return UserSettings.objects.filter(user=self.request.user)
 
     def get_object(self):
-        settings, _created = UserSettings.objects.get_or_create(user=self.request.user)
-        return settings
+        user = self.request.user
+        try:
+            # The reverse one-to-one caches on request.user, so later lookups in the request are free.
+            return user.settings
+        except UserSettings.DoesNotExist:
+            settings, _created = UserSettings.objects.get_or_create(user=user)
+            return settings
 
     def list(self, request, *args, **kwargs):
         serializer = self.get_serializer(self.get_object())
@@ -52,18 +57,22 @@ class ServerSettingsViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        server_id = self.kwargs.get("server_id")
-        server = get_object_or_404(Server, id=server_id)
-        settings, _created = ServerSettings.objects.get_or_create(server=server)
-        if not ServerMember.objects.filter(
-            server=server, user=self.request.user, is_banned=False
-        ).exists() and server.owner != self.request.user and not self.request.user.is_admin:
+        # The server and its settings come back in a single query; membership is read from the cache.
+        server = get_object_or_404(Server.objects.select_related("settings"), id=self.kwargs.get("server_id"))
+        user = self.request.user
+        if server.owner_id != user.id and not user.is_admin and not user_is_server_member(user, server.pk):
             raise PermissionDenied("You do not have access to this server's settings.")
-        return settings
+        try:
+            return server.settings
+        except ServerSettings.DoesNotExist:
+            settings, _created = ServerSettings.objects.get_or_create(server=server)
+            # A row fetched by a concurrent create does not carry the server; reuse the one loaded above.
+            settings.server = server
+            return settings
 
     def _assert_permission(self, server_settings: ServerSettings) -> None:
-        server = server_settings.server
-        if server.owner != self.request.user and not self.request.user.is_admin:
+        # get_object() attaches the already-loaded server, so this compares ids without a query.
+        if server_settings.server.owner_id != self.request.user.id and not self.request.user.is_admin:
             raise PermissionDenied("You do not have permission to modify these settings.")
 
     def retrieve(self, request, *args, **kwargs):  # type: ignore[override]
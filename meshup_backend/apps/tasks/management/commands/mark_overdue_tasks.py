@@ -0,0 +1,18 @@
+"""Flag open tasks whose due date has passed as overdue."""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = "Move pending and in-progress tasks past their due date to the overdue status."
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        updated = Task.objects.filter(
+            is_deleted=False,
+            due_date__lt=now,
+            status__in=("pending", "in_progress"),
+        ).update(status="overdue", updated_at=now)
+        self.stdout.write(self.style.SUCCESS(f"Marked {updated} task(s) as overdue."))
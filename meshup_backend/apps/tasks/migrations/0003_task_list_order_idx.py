@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-15 23:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["server", "-created_at"],
+                name="task_list_order_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def create_tags_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS tasks_tags_gin ON tasks USING gin (tags jsonb_path_ops)"
+        )
+
+
+def drop_tags_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS tasks_tags_gin")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0003_task_list_order_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_tags_index, drop_tags_index),
+    ]
@@ -16,6 +16,7 @@ class Task(models.Model):
         ("overdue", "Overdue"),
         ("cancelled", "Cancelled"),
     )
+    CLOSED_STATUSES = ("completed", "cancelled")
 
     PRIORITY_CHOICES = (
         ("low", "Low"),
@@ -67,17 +68,19 @@ class Task(models.Model):
             models.Index(fields=["assigned_to", "status"]),
             models.Index(fields=["due_date", "status"]),
             models.Index(fields=["-priority", "status"]),
+            # Serves the per-server task list in its default (-created_at) order without a sort step.
+            models.Index(
+                fields=["server", "-created_at"],
+                name="task_list_order_idx",
+                condition=models.Q(is_deleted=False),
+            ),
         ]
 
     def __str__(self) -> str:
         return f"{self.title} ({self.status})"
 
     def save(self, *args, **kwargs):
-        if self.due_date and self.due_date < timezone.now() and self.status not in [
-            "completed",
-            "cancelled",
-        ]:
-            self.status = "overdue"
+        # Overdue transitions are applied in bulk by the mark_overdue_tasks command.
         if self.status == "completed" and not self.completed_at:
             self.completed_at = timezone.now()
         super().save(*args, **kwargs)
@@ -4,6 +4,7 @@ from django.utils import timezone
 from rest_framework import serializers
 
 from apps.users.serializers import UserBasicSerializer
+from config.serializers import CachedFieldsMixin
 
 from .models import Task, TaskAttachment, TaskComment
 
@@ -19,7 +20,7 @@ class TaskAttachmentSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "uploaded_by", "created_at")
 
 
-class TaskCommentSerializer(serializers.ModelSerializer):
+class TaskCommentSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for task comments."""
 
     author = UserBasicSerializer(read_only=True)
@@ -41,12 +42,48 @@ class TaskCommentSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "task", "author", "is_edited", "created_at", "edited_at")
 
     def get_replies(self, obj):
-        if obj.replies.exists():
-            return TaskCommentSerializer(obj.replies.all(), many=True, context=self.context).data
-        return []
+        return TaskCommentSerializer(obj.replies.all(), many=True, context=self.context).data
 
 
-class TaskSerializer(serializers.ModelSerializer):
+_comment_datetime = serializers.DateTimeField()
+
+
+def _format_datetime(value):
+    return _comment_datetime.to_representation(value) if value is not None else None
+
+
+def serialize_comment_thread(comments, *, context) -> list:
+    """Render a task's comments as TaskCommentSerializer's nested reply tree without a serializer per node.
+
+    ``comments`` is the task's whole thread in display order; each author is serialized once.
+    """
+    authors = {}
+    nodes = {}
+    for comment in comments:
+        if comment.author_id not in authors:
+            authors[comment.author_id] = UserBasicSerializer(comment.author, context=context).data
+        nodes[comment.id] = {
+            "id": str(comment.id),
+            "task": str(comment.task_id),
+            "author": authors[comment.author_id],
+            "content": comment.content,
+            "reply_to": str(comment.reply_to_id) if comment.reply_to_id else None,
+            "replies": [],
+            "is_edited": comment.is_edited,
+            "created_at": _format_datetime(comment.created_at),
+            "edited_at": _format_datetime(comment.edited_at),
+        }
+
+    roots = []
+    for comment in comments:
+        if comment.reply_to_id is None:
+            roots.append(nodes[comment.id])
+        elif comment.reply_to_id in nodes:
+            nodes[comment.reply_to_id]["replies"].append(nodes[comment.id])
+    return roots
+
+
+class TaskSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Complete serializer for tasks."""
 
     assigned_to = UserBasicSerializer(read_only=True)
@@ -88,13 +125,18 @@ class TaskSerializer(serializers.ModelSerializer):
         )
 
     def get_comments_count(self, obj):
-        return obj.comments.count()
+        count = getattr(obj, "comments_total", None)
+        return obj.comments.count() if count is None else count
 
     def get_attachments_count(self, obj):
-        return obj.task_attachments.count()
+        count = getattr(obj, "attachments_total", None)
+        return obj.task_attachments.count() if count is None else count
 
     def get_is_overdue(self, obj):
-        if obj.due_date and obj.status not in ["completed", "cancelled"]:
+        overdue = getattr(obj, "overdue", None)
+        if overdue is not None:
+            return overdue
+        if obj.due_date and obj.status not in Task.CLOSED_STATUSES:
             return obj.due_date < timezone.now()
         return False
 
@@ -127,21 +169,20 @@ class TaskCreateUpdateSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         assigned_to_id = validated_data.pop("assigned_to_id", None)
-        task = Task.objects.create(assigned_by=self.context["request"].user, **validated_data)
         if assigned_to_id:
+            # Resolve the assignee first so the task is written with a single INSERT.
             User = get_user_model()
             try:
-                task.assigned_to = User.objects.get(id=assigned_to_id)
+                validated_data["assigned_to"] = User.objects.get(id=assigned_to_id)
             except User.DoesNotExist as exc:
                 raise serializers.ValidationError({"assigned_to_id": "Assigned user not found."}) from exc
-            task.save(update_fields=["assigned_to"])
-        return task
+        return Task.objects.create(assigned_by=self.context["request"].user, **validated_data)
 
     def update(self, instance, validated_data):
         assigned_to_id = validated_data.pop("assigned_to_id", None)
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        if assigned_to_id is not None:
+        if assigned_to_id is not None and assigned_to_id != instance.assigned_to_id:
             User = get_user_model()
             if assigned_to_id:
                 try:
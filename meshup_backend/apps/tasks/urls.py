@@ -10,6 +10,7 @@ detail = TaskViewSet.as_view({
     "patch": "partial_update",
     "delete": "destroy",
 })
+export = TaskViewSet.as_view({"get": "export"})
 comments = TaskViewSet.as_view({"get": "comments", "post": "comments"})
 attachments = TaskViewSet.as_view({"post": "attachments"})
 assign = TaskViewSet.as_view({"post": "assign"})
@@ -17,6 +18,7 @@ complete = TaskViewSet.as_view({"post": "complete"})
 
 urlpatterns = [
     path("<uuid:server_id>/", list_create, name="task-list"),
+    path("<uuid:server_id>/export/", export, name="task-export"),
     path("<uuid:server_id>/<uuid:pk>/", detail, name="task-detail"),
     path("<uuid:server_id>/<uuid:pk>/comments/", comments, name="task-comments"),
     path("<uuid:server_id>/<uuid:pk>/attachments/", attachments, name="task-attachments"),
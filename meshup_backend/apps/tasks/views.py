@@ -1,32 +1,78 @@
 """Task API views."""
+import json
+import uuid
+
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections, transaction
+from django.db.models import BooleanField, Case, Count, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.http import QueryDict, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.rest_framework import CharFilter, DjangoFilterBackend, FilterSet
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 
 from apps.servers.models import Server
-from apps.roles.models import ServerMember
+from apps.roles.utils import user_is_server_member
 from apps.users.models import User
+from apps.users.serializers import user_basic_fields
+from config.renderers import OrjsonRenderer
 
-from .models import Task, TaskAttachment, TaskComment
+from .models import Task, TaskAssignee, TaskAttachment, TaskComment
 from .serializers import (
     TaskAttachmentSerializer,
     TaskCommentSerializer,
     TaskCreateUpdateSerializer,
     TaskSerializer,
+    serialize_comment_thread,
 )
 
+EXPORT_CHUNK_SIZE = 500
+
+
+class TaskFilterSet(FilterSet):
+    """Declared once so the filter backend does not build a FilterSet class per request."""
+
+    tag = CharFilter(method="filter_tag")
+
+    class Meta:
+        model = Task
+        fields = ["status", "priority", "assigned_to", "assigned_by", "channel"]
+
+    def filter_tag(self, queryset, name, value):
+        if connections[queryset.db].features.supports_json_field_contains:
+            # jsonb containment, served by the tasks_tags_gin index on PostgreSQL.
+            return queryset.filter(tags__contains=[value])
+        return queryset.filter(tags__icontains=json.dumps(value))
+
+
+def _related_count(model) -> Coalesce:
+    """Count ``model`` rows pointing at the outer task through their ``task`` foreign key."""
+    counts = model.objects.filter(task=OuterRef("pk")).order_by().values("task").annotate(c=Count("pk")).values("c")
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def _update_task(task: Task, **fields) -> None:
+    """Write the given fields with a single UPDATE, skipping ``Task.save`` and its status recomputation."""
+    fields["updated_at"] = timezone.now()
+    Task.objects.filter(pk=task.pk).update(**fields)
+    for name, value in fields.items():
+        setattr(task, name, value)
+    if "status" in fields or "due_date" in fields:
+        # The queryset's overdue annotation no longer matches; let the serializer recompute it.
+        task.__dict__.pop("overdue", None)
+
 
 class TaskViewSet(viewsets.ModelViewSet):
     """ViewSet for managing tasks within servers."""
 
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ["status", "priority", "assigned_to", "assigned_by", "channel"]
-    search_fields = ["title", "description", "tags"]
+    filterset_class = TaskFilterSet
+    search_fields = ["title", "description"]
     ordering_fields = ["created_at", "due_date", "priority", "status"]
     ordering = ["-created_at"]
 
@@ -35,51 +81,90 @@ class TaskViewSet(viewsets.ModelViewSet):
             return TaskCreateUpdateSerializer
         return TaskSerializer
 
+    def get_server(self) -> Server:
+        """Return the URL's server, loaded once per request."""
+        if not hasattr(self, "_server"):
+            self._server = get_object_or_404(Server, id=self.kwargs.get("server_id"))
+        return self._server
+
+    def _can_access(self, server: Server) -> bool:
+        user = self.request.user
+        return server.owner_id == user.id or user.is_admin or user_is_server_member(user, server.pk)
+
     def get_queryset(self):
         if getattr(self, "swagger_fake_view", False):
             return Task.objects.none()
 
-        server_id = self.kwargs.get("server_id")
-        if not server_id:
+        if not self.kwargs.get("server_id"):
             return Task.objects.none()
 
-        server = get_object_or_404(Server, id=server_id)
-        if not ServerMember.objects.filter(
-            server=server, user=self.request.user, is_banned=False
-        ).exists() and server.owner != self.request.user and not self.request.user.is_admin:
+        server = self.get_server()
+        if not self._can_access(server):
             raise PermissionDenied("You do not have access to this server's tasks.")
         queryset = (
             Task.objects.filter(server=server, is_deleted=False)
-            .select_related("assigned_to", "assigned_by", "server")
+            .select_related("assigned_to", "assigned_by")
+            .annotate(
+                # Correlated subqueries: joining both relations would multiply comments by attachments.
+                comments_total=_related_count(TaskComment),
+                attachments_total=_related_count(TaskAttachment),
+                overdue=Case(
+                    When(Q(due_date__lt=timezone.now()) & ~Q(status__in=Task.CLOSED_STATUSES), then=Value(True)),
+                    default=Value(False),
+                    output_field=BooleanField(),
+                ),
+            )
         )
         status_filter = self.request.query_params.get("status")
         if status_filter:
             queryset = queryset.filter(status=status_filter)
         if self.request.query_params.get("assigned_to_me") == "true":
             queryset = queryset.filter(assigned_to=self.request.user)
+        if self.action in {"list", "export"}:
+            # Load only the task columns TaskSerializer renders and the users' UserBasicSerializer fields.
+            queryset = queryset.only(
+                *(field for field in TaskSerializer.Meta.fields if field not in TaskSerializer._declared_fields),
+                *user_basic_fields("assigned_to"),
+                *user_basic_fields("assigned_by"),
+            )
         return queryset
 
     def perform_create(self, serializer):
-        server_id = self.kwargs.get("server_id")
-        server = get_object_or_404(Server, id=server_id)
-        if not ServerMember.objects.filter(
-            server=server, user=self.request.user, is_banned=False
-        ).exists() and server.owner != self.request.user and not self.request.user.is_admin:
+        server = self.get_server()
+        if not self._can_access(server):
             raise PermissionDenied("You do not have permission to create tasks for this server.")
         return serializer.save(server=server)
 
     def perform_destroy(self, instance):
-        instance.is_deleted = True
-        instance.deleted_at = timezone.now()
-        instance.save(update_fields=["is_deleted", "deleted_at"])
+        _update_task(instance, is_deleted=True, deleted_at=timezone.now())
+
+    @action(detail=False, methods=["get"])
+    def export(self, request, server_id=None):
+        """Stream every matching task as newline-delimited JSON without loading them all at once."""
+        queryset = self.filter_queryset(self.get_queryset())
+        context = self.get_serializer_context()
+        renderer = OrjsonRenderer()
+
+        def render_row(task):
+            return renderer.render(TaskSerializer(task, context=context).data) + b"\n"
+
+        if isinstance(request._request, ASGIRequest):
+            # Django buffers sync iterators in full under ASGI, so stream from an async one there.
+            async def rows():
+                async for task in queryset.aiterator(chunk_size=EXPORT_CHUNK_SIZE):
+                    yield render_row(task)
+
+            return StreamingHttpResponse(rows(), content_type="application/x-ndjson")
+        rows = (render_row(task) for task in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE))
+        return StreamingHttpResponse(rows, content_type="application/x-ndjson")
 
     @action(detail=True, methods=["get", "post"])
     def comments(self, request, server_id=None, pk=None):
         task = self.get_object()
         if request.method == "GET":
-            comments = task.comments.filter(reply_to__isnull=True)
-            serializer = TaskCommentSerializer(comments, many=True, context={"request": request})
-            return Response(serializer.data)
+            # Load the whole thread in one query and assemble the reply tree in Python.
+            comments = list(task.comments.select_related("author"))
+            return Response(serialize_comment_thread(comments, context={"request": request}))
         serializer = TaskCommentSerializer(data=request.data, context={"request": request})
         serializer.is_valid(raise_exception=True)
         serializer.save(task=task, author=request.user)
@@ -88,42 +173,74 @@ class TaskViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["post"])
     def attachments(self, request, server_id=None, pk=None):
         task = self.get_object()
-        file_obj = request.FILES.get("file")
-        if not file_obj:
+        file_objs = request.FILES.getlist("files")
+        if not file_objs and not request.FILES.get("file"):
             return Response({"error": "File is required"}, status=status.HTTP_400_BAD_REQUEST)
-        attachment = TaskAttachment.objects.create(
-            task=task,
-            file=file_obj,
-            file_name=file_obj.name,
-            file_size=file_obj.size,
-            uploaded_by=request.user,
-        )
-        serializer = TaskAttachmentSerializer(attachment, context={"request": request})
+
+        attachments = []
+        for file_obj in file_objs or [request.FILES["file"]]:
+            attachment = TaskAttachment(
+                task=task,
+                file_name=file_obj.name,
+                file_size=file_obj.size,
+                uploaded_by=request.user,
+            )
+            # bulk_create skips FileField.pre_save, so store each upload before the single INSERT.
+            attachment.file.save(file_obj.name, file_obj, save=False)
+            attachments.append(attachment)
+        TaskAttachment.objects.bulk_create(attachments, batch_size=100)
+
+        if file_objs:
+            serializer = TaskAttachmentSerializer(attachments, many=True, context={"request": request})
+        else:
+            serializer = TaskAttachmentSerializer(attachments[0], context={"request": request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=["post"])
     def assign(self, request, server_id=None, pk=None):
         task = self.get_object()
-        user_id = request.data.get("user_id")
-        if not user_id:
-            return Response({"error": "user_id is required"}, status=status.HTTP_400_BAD_REQUEST)
-        user = get_object_or_404(User, id=user_id)
-        if not ServerMember.objects.filter(
-            server=task.server, user=user, is_banned=False
-        ).exists():
+        if isinstance(request.data, QueryDict):
+            # Form-encoded requests repeat the user_ids field; .get() would only return the last value.
+            user_ids = request.data.getlist("user_ids") or None
+        else:
+            user_ids = request.data.get("user_ids")
+        if user_ids is None:
+            user_ids = [request.data["user_id"]] if request.data.get("user_id") else []
+        if not user_ids or not isinstance(user_ids, list):
+            return Response({"error": "user_ids or user_id is required"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            user_ids = list(dict.fromkeys(uuid.UUID(str(user_id)) for user_id in user_ids))
+        except ValueError:
+            return Response({"error": "Invalid user id."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # One query validates every requested assignee and loads the users the response needs.
+        members = {
+            user.id: user
+            for user in User.objects.filter(
+                id__in=user_ids,
+                server_memberships__server_id=task.server_id,
+                server_memberships__is_banned=False,
+            )
+        }
+        if len(members) != len(user_ids):
             return Response({"error": "User is not a member of this server."}, status=status.HTTP_400_BAD_REQUEST)
-        task.assigned_to = user
-        task.save(update_fields=["assigned_to"])
+
+        # The request names the complete assignee set: drop anyone left out, add the newcomers.
+        with transaction.atomic():
+            TaskAssignee.objects.filter(task=task).exclude(user_id__in=user_ids).delete()
+            TaskAssignee.objects.bulk_create(
+                [TaskAssignee(task=task, user_id=user_id) for user_id in user_ids],
+                ignore_conflicts=True,
+                batch_size=500,
+            )
+            _update_task(task, assigned_to=members[user_ids[0]])
         serializer = TaskSerializer(task, context={"request": request})
         return Response({"message": "Task assigned successfully", "task": serializer.data})
 
     @action(detail=True, methods=["post"])
     def complete(self, request, server_id=None, pk=None):
         task = self.get_object()
-        task.status = "completed"
-        task.progress = 100
-        task.completed_at = timezone.now()
-        task.save(update_fields=["status", "progress", "completed_at"])
+        _update_task(task, status="completed", progress=100, completed_at=timezone.now())
         serializer = TaskSerializer(task, context={"request": request})
         return Response({"message": "Task completed successfully", "task": serializer.data})
 
@@ -131,6 +248,8 @@ class TaskViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         task = self.perform_create(serializer)
+        # A new task has nothing attached yet; spare TaskSerializer its two COUNT queries.
+        task.comments_total = task.attachments_total = 0
         output = TaskSerializer(task, context={"request": request})
         headers = self.get_success_headers(output.data)
         return Response(output.data, status=status.HTTP_201_CREATED, headers=headers)
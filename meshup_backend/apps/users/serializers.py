@@ -14,6 +14,12 @@ class UserBasicSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+def user_basic_fields(relation: str) -> tuple:
+    """Return ``only()`` lookups covering UserBasicSerializer through ``relation``."""
+
+    return tuple(f"{relation}__{field}" for field in UserBasicSerializer.Meta.fields)
+
+
 class UserDetailSerializer(serializers.ModelSerializer):
     """Detailed serializer for user profiles."""
 
@@ -0,0 +1,30 @@
+"""Response renderers for Meshup backend."""
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+class OrjsonRenderer(JSONRenderer):
+    """Render compact JSON with orjson, matching DRF's JSONRenderer output.
+
+    orjson only covers compact, UTF-8, non-strict output (``COMPACT_JSON=True``, ``UNICODE_JSON=True``,
+    ``STRICT_JSON=False``); there NaN and Infinity render as ``null``. Any other setting, or an ``indent``
+    in the Accept header, is rendered by DRF's JSONRenderer instead.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if (
+            self.strict
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Datetimes, decimals and lazy strings go through DRF's encoder so their formatting is unchanged.
+        ret = orjson.dumps(data, default=JSONEncoder().default, option=_ORJSON_OPTIONS)
+        # Escape the JavaScript line terminators the same way DRF does.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
@@ -0,0 +1,19 @@
+"""Shared serializer helpers for Meshup backend."""
+import copy
+
+
+class CachedFieldsMixin:
+    """Build a ModelSerializer's fields once per class and give each instance fresh copies.
+
+    ``ModelSerializer.get_fields`` introspects the model on every instantiation. The unbound fields are
+    cached on the class and deep-copied per instance, so binding never shares field objects between
+    concurrent serializers. Only use it on serializers whose fields do not depend on instance state.
+    """
+
+    def get_fields(self):
+        cls = type(self)
+        fields = cls.__dict__.get("_cached_fields")
+        if fields is None:
+            fields = super().get_fields()
+            cls._cached_fields = fields
+        return copy.deepcopy(fields)
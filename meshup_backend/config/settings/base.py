@@ -185,6 +185,9 @@ REDOC_SETTINGS = {
     "HIDE_HOSTNAME": False,
 }
 
+redis_host = config("REDIS_HOST", default="redis")
+redis_port = config("REDIS_PORT", default=6379, cast=int)
+
 CHANNEL_LAYER_BACKEND = config("CHANNEL_LAYER_BACKEND", default="redis").lower()
 if CHANNEL_LAYER_BACKEND == "inmemory":
     CHANNEL_LAYERS = {
@@ -192,18 +195,43 @@ if CHANNEL_LAYER_BACKEND == "inmemory":
             "BACKEND": "channels.layers.InMemoryChannelLayer",
         }
     }
+elif CHANNEL_LAYER_BACKEND == "redis-pubsub":
+    # One PUBLISH per group_send regardless of group size; no per-channel queues or capacity.
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.pubsub.RedisPubSubChannelLayer",
+            "CONFIG": {
+                "hosts": [(redis_host, redis_port)],
+            },
+        }
+    }
 else:
-    redis_host = config("REDIS_HOST", default="redis")
-    redis_port = config("REDIS_PORT", default=6379, cast=int)
     CHANNEL_LAYERS = {
         "default": {
             "BACKEND": "channels_redis.core.RedisChannelLayer",
             "CONFIG": {
                 "hosts": [(redis_host, redis_port)],
+                "capacity": config("CHANNEL_LAYER_CAPACITY", default=1000, cast=int),
+                "expiry": config("CHANNEL_LAYER_EXPIRY", default=10, cast=int),
             },
         }
     }
 
+CACHE_BACKEND = config("CACHE_BACKEND", default="redis").lower()
+if CACHE_BACKEND == "locmem":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": f"redis://{redis_host}:{redis_port}/1",
+        }
+    }
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
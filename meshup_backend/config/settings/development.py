@@ -8,8 +8,10 @@ EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 CORS_ALLOW_ALL_ORIGINS = True
 
 REST_FRAMEWORK.update({  # type: ignore[attr-defined]
+    # OrjsonRenderer only takes over for non-strict output; see its docstring.
+    "STRICT_JSON": False,
     "DEFAULT_RENDERER_CLASSES": (
-        "rest_framework.renderers.JSONRenderer",
+        "config.renderers.OrjsonRenderer",
         "rest_framework.renderers.BrowsableAPIRenderer",
     )
 })
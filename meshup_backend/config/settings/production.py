@@ -11,5 +11,7 @@ CSRF_COOKIE_SECURE = True
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 REST_FRAMEWORK.update({  # type: ignore[attr-defined]
-    "DEFAULT_RENDERER_CLASSES": ("rest_framework.renderers.JSONRenderer",)
+    # OrjsonRenderer only takes over for non-strict output; see its docstring.
+    "STRICT_JSON": False,
+    "DEFAULT_RENDERER_CLASSES": ("config.renderers.OrjsonRenderer",),
 })
@@ -15,4 +15,10 @@ CHANNEL_LAYERS = {
 	}
 }
 
+CACHES = {
+	"default": {
+		"BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+	}
+}
+
 SWAGGER_USE_COMPAT_RENDERERS = False
\ No newline at end of file
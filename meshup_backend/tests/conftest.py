@@ -0,0 +1,44 @@
+"""Fixtures shared across the Meshup test suite."""
+import pytest
+from rest_framework.test import APIClient
+
+from apps.roles.models import ServerMember
+from apps.servers.models import Server
+from apps.users.models import User
+
+TEST_PASSWORD = "strongpass123"
+
+
+@pytest.fixture
+def make_user():
+    """Create users named ``username`` with the shared test password."""
+
+    def make_user(username, **extra_fields):
+        return User.objects.create_user(
+            email=f"{username}@example.com", username=username, password=TEST_PASSWORD, **extra_fields
+        )
+
+    return make_user
+
+
+@pytest.fixture
+def owner(make_user):
+    return make_user("owner")
+
+
+@pytest.fixture
+def server(owner):
+    """A server whose owner also holds the owner membership, as the create endpoint leaves it."""
+
+    server = Server.objects.create(name="Meshup", owner=owner)
+    ServerMember.objects.create(server=server, user=owner, is_owner=True)
+    return server
+
+
+@pytest.fixture
+def api_client(owner):
+    """An APIClient authenticated as the server owner."""
+
+    client = APIClient()
+    client.force_authenticate(user=owner)
+    return client
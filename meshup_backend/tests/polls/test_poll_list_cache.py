@@ -0,0 +1,101 @@
+"""The poll list cache must serve repeats and rotate when polls change."""
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.polls.models import Poll, PollOption
+from apps.roles.models import ServerMember
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _poll(server, owner, question):
+    poll = Poll.objects.create(question=question, server=server, created_by=owner)
+    PollOption.objects.create(poll=poll, option_text="Yes", position=0)
+    return poll
+
+
+def _list(client, server):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(f"/api/v1/polls/{server.id}/")
+    assert response.status_code == 200
+    return response.json(), len(queries)
+
+
+def test_repeated_list_is_served_from_the_cache(api_client, owner, server):
+    _poll(server, owner, "Lunch?")
+
+    first, first_queries = _list(api_client, server)
+    second, second_queries = _list(api_client, server)
+
+    assert second == first
+    assert second_queries < first_queries
+
+
+def test_vote_rotates_the_cached_page(api_client, owner, server):
+    poll = _poll(server, owner, "Lunch?")
+    _list(api_client, server)
+
+    option = poll.options.get()
+    response = api_client.post(
+        f"/api/v1/polls/{server.id}/{poll.id}/vote/", {"option_ids": [str(option.id)]}, format="json"
+    )
+    assert response.status_code == 200
+
+    page, _ = _list(api_client, server)
+    assert page["results"][0]["total_votes"] == 1
+
+
+def test_deleting_a_poll_rotates_the_cached_page(api_client, owner, server):
+    _poll(server, owner, "Lunch?")
+    doomed = _poll(server, owner, "Dinner?")
+    assert _list(api_client, server)[0]["count"] == 2
+
+    assert api_client.delete(f"/api/v1/polls/{server.id}/{doomed.id}/").status_code == 204
+
+    page, _ = _list(api_client, server)
+    assert [poll["question"] for poll in page["results"]] == ["Lunch?"]
+
+
+def test_cached_pages_are_per_viewer(api_client, owner, server, make_user):
+    poll = _poll(server, owner, "Lunch?")
+    other = make_user("other")
+    ServerMember.objects.create(server=server, user=other)
+    api_client.post(
+        f"/api/v1/polls/{server.id}/{poll.id}/vote/", {"option_ids": [str(poll.options.get().id)]}, format="json"
+    )
+    _list(api_client, server)
+
+    other_client = APIClient()
+    other_client.force_authenticate(user=other)
+    page, _ = _list(other_client, server)
+
+    assert page["results"][0]["user_votes"] == []
+
+
+def test_cached_page_follows_poll_expiry(api_client, owner, server, monkeypatch):
+    start = timezone.now()
+    poll = _poll(server, owner, "Lunch?")
+    Poll.objects.filter(pk=poll.pk).update(expires_at=start + timedelta(seconds=60))
+    monkeypatch.setattr(timezone, "now", lambda: start)
+    page, _ = _list(api_client, server)
+    assert page["results"][0]["is_expired"] is False
+    assert page["results"][0]["can_vote"] is True
+
+    monkeypatch.setattr(timezone, "now", lambda: start + timedelta(seconds=61))
+    page, _ = _list(api_client, server)
+
+    assert page["results"][0]["is_expired"] is True
+    assert page["results"][0]["can_vote"] is False
@@ -2,6 +2,7 @@
 import asyncio
 
 from asgiref.sync import sync_to_async
+import msgpack
 import pytest
 from channels.layers import get_channel_layer
 from channels.testing import WebsocketCommunicator
@@ -9,7 +10,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 
 from config.asgi import application
 from apps.channels.models import Channel
-from apps.messages.models import DirectMessage
+from apps.messages.models import DirectMessage, Message
 from apps.roles.models import ServerMember
 from apps.servers.models import Server
 from apps.users.models import User
@@ -57,6 +58,9 @@ async def test_channel_websocket_message_flow(settings):
 
     await communicator.disconnect()
 
+    persisted = await sync_to_async(Message.objects.filter(channel=channel, content="Hello realtime").exists)()
+    assert persisted
+
     channel_layer = get_channel_layer()
     assert channel_layer is not None
 
@@ -105,5 +109,90 @@ async def test_dm_websocket_message_flow(settings):
 
     await communicator.disconnect()
 
+    await sync_to_async(dm.refresh_from_db)()
+    assert dm.last_message_at is not None
+
     channel_layer = get_channel_layer()
     assert channel_layer is not None
+
+
+@pytest.mark.asyncio
+async def test_channel_websocket_msgpack_subprotocol(settings):
+    settings.CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer",
+        }
+    }
+
+    user = await sync_to_async(User.objects.create_user)(
+        email="packed@example.com", username="packed", password="strongpass123"
+    )
+    server = await sync_to_async(Server.objects.create)(name="Packed", owner=user)
+    channel = await sync_to_async(Channel.objects.create)(name="binary", server=server, created_by=user)
+    await sync_to_async(ServerMember.objects.create)(server=server, user=user, is_owner=True)
+
+    access_token = str(RefreshToken.for_user(user).access_token)
+    communicator = WebsocketCommunicator(
+        application,
+        f"/ws/v1/realtime/servers/{server.id}/channels/{channel.id}/?token={access_token}",
+        subprotocols=["msgpack"],
+    )
+    connected, subprotocol = await communicator.connect()
+    assert connected
+    assert subprotocol == "msgpack"
+
+    join_event = msgpack.unpackb(await asyncio.wait_for(communicator.receive_from(), timeout=2))
+    assert join_event["event"] == "presence.join"
+
+    await communicator.send_to(bytes_data=msgpack.packb({"event": "message.send", "payload": {"content": "Packed"}}))
+
+    ack_event = msgpack.unpackb(await asyncio.wait_for(communicator.receive_from(), timeout=2))
+    assert ack_event["event"] == "message.ack"
+    assert ack_event["payload"]["content"] == "Packed"
+
+    await communicator.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_channel_websocket_message_is_persisted_before_ack(settings):
+    settings.CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer",
+        }
+    }
+
+    user = await sync_to_async(User.objects.create_user)(
+        email="durable@example.com", username="durable", password="strongpass123"
+    )
+    server = await sync_to_async(Server.objects.create)(name="Durable", owner=user)
+    channel = await sync_to_async(Channel.objects.create)(name="general", server=server, created_by=user)
+    await sync_to_async(ServerMember.objects.create)(server=server, user=user, is_owner=True)
+
+    access_token = str(RefreshToken.for_user(user).access_token)
+    communicator = WebsocketCommunicator(
+        application,
+        f"/ws/v1/realtime/servers/{server.id}/channels/{channel.id}/?token={access_token}",
+    )
+    connected, _ = await communicator.connect()
+    assert connected
+    await asyncio.wait_for(communicator.receive_json_from(), timeout=2)
+
+    await communicator.send_json_to(
+        {"event": "message.send", "payload": {"content": "Orphan", "reply_to": "00000000-0000-0000-0000-000000000000"}}
+    )
+    error_event = await asyncio.wait_for(communicator.receive_json_from(), timeout=2)
+    assert error_event["event"] == "error"
+
+    await communicator.send_json_to({"event": "message.send", "payload": {"content": "Durable"}})
+    ack_event = await asyncio.wait_for(communicator.receive_json_from(), timeout=2)
+    assert ack_event["event"] == "message.ack"
+    # The ack is only sent once the row is committed.
+    assert await sync_to_async(Message.objects.filter(id=ack_event["payload"]["id"]).exists)()
+
+    broadcast_event = await asyncio.wait_for(communicator.receive_json_from(), timeout=2)
+    assert broadcast_event["event"] == "message.created"
+    # The post_save signal must not broadcast the websocket message a second time.
+    assert await communicator.receive_nothing(timeout=0.3)
+
+    await communicator.disconnect()
+    assert not await sync_to_async(Message.objects.filter(content="Orphan").exists)()
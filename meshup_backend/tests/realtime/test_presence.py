@@ -0,0 +1,159 @@
+"""Tests for presence connection counting and coalesced join/leave fan-out."""
+import asyncio
+import uuid
+
+import orjson
+import pytest
+from asgiref.sync import sync_to_async
+from channels.layers import InMemoryChannelLayer
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.channels.models import Channel
+from apps.realtime import presence
+from apps.roles.models import ServerMember
+from apps.servers.models import Server
+from apps.users.models import User
+from config.asgi import application
+
+GROUP = "presence-test"
+
+
+@pytest.fixture(autouse=True)
+def short_flush_window(monkeypatch):
+    monkeypatch.setattr(presence, "PRESENCE_FLUSH_INTERVAL", 0.01)
+
+
+async def _subscribe():
+    channel_layer = InMemoryChannelLayer()
+    channel_name = await channel_layer.new_channel()
+    await channel_layer.group_add(GROUP, channel_name)
+    return channel_layer, channel_name
+
+
+async def _flushed_frames(channel_layer, channel_name):
+    await asyncio.sleep(0.05)
+    if presence._flush_tasks:
+        await asyncio.gather(*presence._flush_tasks)
+    frames = []
+    while True:
+        try:
+            message = await asyncio.wait_for(channel_layer.receive(channel_name), timeout=0.05)
+        except asyncio.TimeoutError:
+            return frames
+        frames.append(orjson.loads(message["text"]))
+
+
+def _user(name):
+    return {"id": str(uuid.uuid4()), "username": name}
+
+
+@pytest.mark.asyncio
+async def test_join_burst_is_sent_as_one_batch():
+    channel_layer, channel_name = await _subscribe()
+    users = [_user(name) for name in ("ada", "grace", "linus")]
+
+    for user in users:
+        presence.queue_presence(channel_layer, GROUP, event="presence.join", user=user)
+
+    frames = await _flushed_frames(channel_layer, channel_name)
+    assert frames == [{"event": "presence.batch", "payload": {"joined": users, "left": []}}]
+
+
+@pytest.mark.asyncio
+async def test_single_transition_keeps_the_plain_event():
+    channel_layer, channel_name = await _subscribe()
+    user = _user("ada")
+
+    presence.queue_presence(channel_layer, GROUP, event="presence.leave", user=user)
+
+    frames = await _flushed_frames(channel_layer, channel_name)
+    assert frames == [{"event": "presence.leave", "payload": {"user": user}}]
+
+
+@pytest.mark.asyncio
+async def test_reconnect_inside_one_window_sends_nothing():
+    channel_layer, channel_name = await _subscribe()
+    user = _user("ada")
+
+    presence.queue_presence(channel_layer, GROUP, event="presence.leave", user=user)
+    presence.queue_presence(channel_layer, GROUP, event="presence.join", user=user)
+
+    assert await _flushed_frames(channel_layer, channel_name) == []
+
+
+@pytest.mark.asyncio
+async def test_connection_counts_report_first_and_last_connection():
+    user_id = uuid.uuid4()
+    first, second = presence.PresenceLease(GROUP, user_id), presence.PresenceLease(GROUP, user_id)
+
+    assert await first.acquire() is True
+    assert await second.acquire() is False
+    assert await first.release() is False
+    assert await second.release() is True
+
+
+@pytest.mark.asyncio
+async def test_expired_count_with_two_open_connections_recovers_on_refresh():
+    user_id = uuid.uuid4()
+    first, second = presence.PresenceLease(GROUP, user_id), presence.PresenceLease(GROUP, user_id)
+    await first.acquire()
+    await second.acquire()
+    await cache.aclear()
+
+    # Before either connection refreshes, closing one must not report the user as gone.
+    assert await first.release() is False
+
+    first = presence.PresenceLease(GROUP, user_id)
+    await first.acquire()
+    await second.refresh()
+    third = presence.PresenceLease(GROUP, user_id)
+    assert await third.acquire() is False
+    assert await third.release() is False
+    assert await first.release() is False
+    assert await second.release() is True
+
+
+@pytest.mark.asyncio
+async def test_refresh_restores_every_open_connection_once():
+    user_id = uuid.uuid4()
+    leases = [presence.PresenceLease(GROUP, user_id) for _ in range(2)]
+    for lease in leases:
+        await lease.acquire()
+    await cache.aclear()
+
+    for _ in range(2):
+        for lease in leases:
+            await lease.refresh()
+
+    assert await leases[0].release() is False
+    assert await leases[1].release() is True
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_open_connection_renews_its_count_without_pings(settings, monkeypatch):
+    settings.CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+    monkeypatch.setattr(presence, "PRESENCE_REFRESH_INTERVAL", 0.05)
+    user = await sync_to_async(User.objects.create_user)(
+        email="quiet@example.com", username="quiet", password="strongpass123"
+    )
+    server = await sync_to_async(Server.objects.create)(name="Quiet", owner=user)
+    channel = await sync_to_async(Channel.objects.create)(name="general", server=server, created_by=user)
+    await sync_to_async(ServerMember.objects.create)(server=server, user=user, is_owner=True)
+    token = str(RefreshToken.for_user(user).access_token)
+    communicator = WebsocketCommunicator(
+        application, f"/ws/v1/realtime/servers/{server.id}/channels/{channel.id}/?token={token}"
+    )
+    connected, _ = await communicator.connect()
+    assert connected
+
+    key = presence.presence_cache_key(f"realtime.channel.{channel.id}", user.id)
+    await cache.aclear()
+    await asyncio.sleep(0.2)
+
+    epoch = await cache.aget(key)
+    assert await cache.aget(presence._count_key(f"realtime.channel.{channel.id}", user.id, epoch)) == 1
+    await communicator.disconnect()
+    assert await cache.aget(key) is None
@@ -0,0 +1,24 @@
+"""Realtime message payloads must match what the REST API renders for the same message."""
+import orjson
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from apps.channels.models import Channel
+from apps.messages.models import Message
+from apps.messages.serializers import MessageSerializer
+from apps.realtime.utils import serialize_new_message_for_realtime, serialize_user_basic
+
+pytestmark = pytest.mark.django_db
+
+
+def test_realtime_message_payload_matches_rest_rendering(owner, server):
+    channel = Channel.objects.create(name="general", server=server, created_by=owner)
+    original = Message.objects.create(channel=channel, author=owner, content="First")
+    reply = Message.objects.create(channel=channel, author=owner, content="Second", reply_to=original)
+    reply = Message.objects.select_related("reply_to__author").get(pk=reply.pk)
+
+    realtime = orjson.loads(orjson.dumps(serialize_new_message_for_realtime(reply, author=serialize_user_basic(owner))))
+    rest = orjson.loads(JSONRenderer().render(MessageSerializer(reply).data))
+
+    assert realtime == rest
+    assert realtime["reply_to"]["created_at"].endswith("Z")
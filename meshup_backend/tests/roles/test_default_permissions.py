@@ -0,0 +1,46 @@
+"""Tests for the memoised default permission map."""
+import pytest
+
+from apps.roles import services
+from apps.roles.constants import DEFAULT_PERMISSION_DEFINITIONS
+from apps.roles.models import Permission
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def fresh_memo():
+    services.reset_default_permissions_cache()
+    yield
+    services.reset_default_permissions_cache()
+
+
+def test_default_permissions_are_memoised_after_commit(django_assert_num_queries, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        created = services.ensure_default_permissions()
+
+    with django_assert_num_queries(0):
+        assert services.ensure_default_permissions() is created
+    assert set(created) == {definition.codename for definition in DEFAULT_PERMISSION_DEFINITIONS}
+
+
+def test_rolled_back_permissions_are_not_memoised(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=False):
+        services.ensure_default_permissions()
+
+    assert services._default_permissions is None
+
+
+def test_deleting_a_permission_resets_the_memo(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        permissions = services.ensure_default_permissions()
+    codename, permission = next(iter(permissions.items()))
+    deleted_pk = permission.pk
+
+    permission.delete()
+
+    assert services._default_permissions is None
+    with django_capture_on_commit_callbacks(execute=True):
+        recreated = services.ensure_default_permissions()
+    assert Permission.objects.filter(codename=codename).exists()
+    assert recreated[codename].pk != deleted_pk
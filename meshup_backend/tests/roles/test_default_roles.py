@@ -0,0 +1,37 @@
+"""Tests for provisioning the default server roles."""
+import pytest
+
+from apps.roles.constants import DEFAULT_ROLE_DEFINITIONS
+from apps.roles.models import Role
+from apps.roles.services import ensure_default_roles
+
+pytestmark = pytest.mark.django_db
+
+
+def test_ensure_default_roles_is_idempotent(server):
+    first = ensure_default_roles(server)
+    second = ensure_default_roles(server)
+
+    assert {key: role.id for key, role in first.items()} == {key: role.id for key, role in second.items()}
+    assert server.roles.count() == len(DEFAULT_ROLE_DEFINITIONS)
+    for key, definition in DEFAULT_ROLE_DEFINITIONS.items():
+        codenames = set(second[key].permissions.values_list("codename", flat=True))
+        assert codenames == set(definition.permissions)
+
+
+def test_ensure_default_roles_tolerates_a_concurrent_insert(server, monkeypatch):
+    bulk_create = Role.objects.bulk_create
+    key, definition = next(iter(DEFAULT_ROLE_DEFINITIONS.items()))
+
+    def racing_bulk_create(objs, *args, **kwargs):
+        # Another request stores one of the roles between our read and our insert.
+        Role.objects.create(server=server, role_type=definition.role_type, name=definition.name)
+        return bulk_create(objs, *args, **kwargs)
+
+    monkeypatch.setattr(Role.objects, "bulk_create", racing_bulk_create)
+    role_map = ensure_default_roles(server)
+
+    assert server.roles.count() == len(DEFAULT_ROLE_DEFINITIONS)
+    assert Role.objects.filter(pk=role_map[key].pk).exists()
+    codenames = set(role_map[key].permissions.values_list("codename", flat=True))
+    assert codenames == set(definition.permissions)
@@ -0,0 +1,83 @@
+"""Tests for the cross-request server membership cache."""
+import pytest
+from django.db import connection
+
+from apps.roles import utils as roles_utils
+from apps.roles.models import ServerMember
+from apps.roles.utils import user_is_server_member
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def user(make_user):
+    return make_user("member")
+
+
+def test_membership_is_cached_between_checks(server, user, django_assert_num_queries):
+    ServerMember.objects.create(server=server, user=user)
+    assert user_is_server_member(user, server.pk)
+    with django_assert_num_queries(0):
+        assert user_is_server_member(user, server.pk)
+
+
+def test_ban_through_save_drops_the_cached_membership(server, user):
+    member = ServerMember.objects.create(server=server, user=user)
+    assert user_is_server_member(user, server.pk)
+    member.is_banned = True
+    member.save()
+    assert not user_is_server_member(user, server.pk)
+
+
+def test_ban_through_queryset_update_drops_the_cached_membership(server, user):
+    ServerMember.objects.create(server=server, user=user)
+    assert user_is_server_member(user, server.pk)
+    ServerMember.objects.filter(server=server, user=user).update(is_banned=True)
+    assert not user_is_server_member(user, server.pk)
+
+
+def test_queryset_delete_drops_the_cached_membership(server, user):
+    ServerMember.objects.create(server=server, user=user)
+    assert user_is_server_member(user, server.pk)
+    server.members.filter(user=user).delete()
+    assert not user_is_server_member(user, server.pk)
+
+
+def test_bulk_create_drops_a_cached_non_membership(server, user):
+    assert not user_is_server_member(user, server.pk)
+    ServerMember.objects.bulk_create([ServerMember(server=server, user=user)])
+    assert user_is_server_member(user, server.pk)
+
+
+def test_access_update_through_a_join_reports_rows_and_drops_the_cache(server, user, django_assert_num_queries):
+    ServerMember.objects.create(server=server, user=user)
+    assert user_is_server_member(user, server.pk)
+
+    with django_assert_num_queries(1):
+        updated = ServerMember.objects.filter(server__name=server.name, user=user).update(is_banned=True)
+
+    assert updated == 1
+    assert not user_is_server_member(user, server.pk)
+
+
+def test_unrelated_update_keeps_caches_and_runs_one_query(server, user, django_assert_num_queries):
+    ServerMember.objects.create(server=server, user=user)
+    assert user_is_server_member(user, server.pk)
+    generation = roles_utils._permission_generation
+
+    with django_assert_num_queries(1):
+        assert ServerMember.objects.filter(server=server, user=user).update(nickname="renamed") == 1
+
+    assert roles_utils._permission_generation == generation
+    with django_assert_num_queries(0):
+        assert user_is_server_member(user, server.pk)
+
+
+def test_access_update_without_returning_support_drops_the_cache(server, user, monkeypatch):
+    monkeypatch.setattr(connection.features, "can_return_columns_from_insert", False)
+    ServerMember.objects.create(server=server, user=user)
+    assert user_is_server_member(user, server.pk)
+
+    assert ServerMember.objects.filter(server=server, user=user).update(is_banned=True) == 1
+
+    assert not user_is_server_member(user, server.pk)
@@ -0,0 +1,56 @@
+"""Tests for server permission checks."""
+import pytest
+
+from apps.roles.constants import ServerPermission
+from apps.roles.models import ServerMember
+from apps.roles.services import assign_admin_role, assign_default_member_role, set_member_roles
+from apps.roles.utils import user_has_server_permission
+from apps.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def member(server, make_user):
+    user = make_user("member")
+    membership = ServerMember.objects.create(server=server, user=user)
+    assign_default_member_role(membership)
+    return membership
+
+
+def test_memoised_permissions_follow_role_changes(server, member):
+    user = User.objects.get(pk=member.user_id)
+    assert not user_has_server_permission(user, server, ServerPermission.MANAGE_ROLES)
+
+    assign_admin_role(member)
+    assert user_has_server_permission(user, server, ServerPermission.MANAGE_ROLES)
+
+    set_member_roles(member, [])
+    assert not user_has_server_permission(user, server, ServerPermission.MANAGE_ROLES)
+
+
+def test_memoised_permissions_drop_when_member_is_banned(server, member):
+    user = User.objects.get(pk=member.user_id)
+    assign_admin_role(member)
+    assert user_has_server_permission(user, server, ServerPermission.MANAGE_ROLES)
+
+    member.is_banned = True
+    member.save()
+    assert not user_has_server_permission(user, server, ServerPermission.MANAGE_ROLES)
+
+
+def test_permission_sets_are_memoised_between_changes(server, member, django_assert_num_queries):
+    user = User.objects.get(pk=member.user_id)
+    user_has_server_permission(user, server, ServerPermission.MANAGE_ROLES)
+    with django_assert_num_queries(0):
+        user_has_server_permission(user, server, ServerPermission.MANAGE_CHANNELS)
+
+
+def test_owner_membership_grants_codenames_without_a_permission_row(server, make_user, django_assert_num_queries):
+    user = make_user("coowner")
+    ServerMember.objects.create(server=server, user=user, is_owner=True)
+    user = User.objects.get(pk=user.pk)
+
+    with django_assert_num_queries(1):
+        assert user_has_server_permission(user, server, "not_seeded_anywhere")
+        assert user_has_server_permission(user, server, ServerPermission.MANAGE_ROLES)
@@ -0,0 +1,14 @@
+"""Swagger schema coverage for role serializers."""
+from drf_yasg import openapi
+from drf_yasg.generators import OpenAPISchemaGenerator
+
+
+def test_role_permissions_are_typed_in_swagger_schema():
+    generator = OpenAPISchemaGenerator(openapi.Info(title="Meshup API", default_version="v1"))
+    schema = generator.get_schema(request=None, public=True)
+
+    permissions = schema["definitions"]["Role"]["properties"]["permissions"]
+
+    assert permissions["type"] == openapi.TYPE_ARRAY
+    assert permissions["items"]["$ref"] == "#/definitions/Permission"
+    assert "codename" in schema["definitions"]["Permission"]["properties"]
@@ -0,0 +1,46 @@
+"""Tests for invite code normalisation."""
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from apps.servers.models import ServerInvite
+
+BEFORE_UPPERCASE = [("servers", "0005_alter_server_region")]
+AFTER_UPPERCASE = [("servers", "0006_serverinvite_code_upper")]
+
+
+def _migrate(targets):
+    executor = MigrationExecutor(connection)
+    executor.loader.build_graph()
+    executor.migrate(targets)
+    return executor.loader.project_state(targets).apps
+
+
+@pytest.mark.django_db
+def test_saved_invite_codes_are_stripped_and_upper_cased(owner, server):
+    invite = ServerInvite.objects.create(server=server, inviter=owner, code=" abCd2345 ")
+
+    assert invite.code == "ABCD2345"
+    generated = ServerInvite.generate_code()
+    assert generated == generated.upper() and len(generated) == 10
+
+
+@pytest.mark.django_db(transaction=True)
+def test_uppercase_migration_regenerates_codes_that_collide_by_case():
+    old_apps = _migrate(BEFORE_UPPERCASE)
+    try:
+        OldUser = old_apps.get_model("users", "User")
+        OldServer = old_apps.get_model("servers", "Server")
+        OldInvite = old_apps.get_model("servers", "ServerInvite")
+        owner = OldUser.objects.create(email="owner@example.com", username="owner", password="!")
+        server = OldServer.objects.create(name="Invites", owner=owner)
+        for code in ("ABCD", "abCD", "ABcd", "wxyz"):
+            OldInvite.objects.create(server=server, code=code)
+    finally:
+        new_apps = _migrate(AFTER_UPPERCASE)
+
+    codes = list(new_apps.get_model("servers", "ServerInvite").objects.values_list("code", flat=True))
+    assert len(codes) == 4
+    assert len(set(codes)) == 4
+    assert all(code == code.upper() for code in codes)
+    assert {"ABCD", "WXYZ"} <= set(codes)
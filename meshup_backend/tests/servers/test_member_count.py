@@ -0,0 +1,53 @@
+"""Server.member_count follows ServerMember rows through signals."""
+import pytest
+
+from apps.roles.models import ServerMember
+from apps.servers.models import Server
+
+pytestmark = pytest.mark.django_db
+
+
+def test_member_count_tracks_joins_and_leaves(owner, make_user):
+    server = Server.objects.create(name="Counted", owner=owner)
+
+    owner_membership = ServerMember.objects.create(server=server, user=owner, is_owner=True)
+    member = ServerMember.objects.create(server=server, user=make_user("guest"))
+    server.refresh_from_db()
+    assert server.member_count == 2
+
+    member.delete()
+    server.refresh_from_db()
+    assert server.member_count == 1
+
+    # Saving an existing membership must not count it again.
+    owner_membership.is_banned = False
+    owner_membership.save()
+    server.refresh_from_db()
+    assert server.member_count == 1
+
+
+def test_member_count_updates_the_server_instance_already_loaded(owner):
+    server = Server.objects.create(name="Loaded", owner=owner)
+
+    membership = ServerMember.objects.create(server=server, user=owner, is_owner=True)
+    assert server.member_count == 1
+
+    membership.delete()
+    assert server.member_count == 0
+
+
+def test_member_count_tracks_bulk_inserts(owner, make_user):
+    server = Server.objects.create(name="Bulk", owner=owner)
+    ServerMember.objects.create(server=server, user=owner, is_owner=True)
+    guests = [make_user("ada"), make_user("grace")]
+
+    ServerMember.objects.bulk_create([ServerMember(server=server, user=guest) for guest in guests])
+    server.refresh_from_db()
+    assert server.member_count == 3
+
+    # Conflicting rows are skipped by the database, so the count must not include them.
+    ServerMember.objects.bulk_create(
+        [ServerMember(server=server, user=guest) for guest in [*guests, make_user("linus")]], ignore_conflicts=True
+    )
+    server.refresh_from_db()
+    assert server.member_count == 4
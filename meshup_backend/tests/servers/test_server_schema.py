@@ -0,0 +1,12 @@
+"""Swagger schema coverage for server serializers."""
+from drf_yasg import openapi
+from drf_yasg.generators import OpenAPISchemaGenerator
+
+
+def test_server_owner_is_typed_in_swagger_schema():
+    generator = OpenAPISchemaGenerator(openapi.Info(title="Meshup API", default_version="v1"))
+    schema = generator.get_schema(request=None, public=True)
+
+    owner = schema["definitions"]["Server"]["properties"]["owner"]
+
+    assert owner["$ref"] == "#/definitions/UserBasic"
@@ -0,0 +1,90 @@
+"""Tests for the task REST endpoints."""
+import pytest
+
+from apps.roles.models import ServerMember
+from apps.tasks.models import Task, TaskAttachment, TaskComment
+
+pytestmark = pytest.mark.django_db
+
+
+def test_task_list_counts_comments_and_attachments_independently(api_client, owner, server):
+    busy = Task.objects.create(title="Busy", server=server, assigned_by=owner)
+    Task.objects.create(title="Quiet", server=server, assigned_by=owner)
+    for index in range(3):
+        TaskComment.objects.create(task=busy, author=owner, content=f"comment {index}")
+    for index in range(2):
+        TaskAttachment.objects.create(
+            task=busy, file=f"task_attachments/{index}.txt", file_name=f"{index}.txt", file_size=1, uploaded_by=owner
+        )
+
+    response = api_client.get(f"/api/v1/tasks/{server.id}/")
+
+    assert response.status_code == 200
+    counts = {task["title"]: (task["comments_count"], task["attachments_count"]) for task in response.json()["results"]}
+    assert counts == {"Busy": (3, 2), "Quiet": (0, 0)}
+
+
+@pytest.fixture
+def teammates(server, make_user):
+    users = []
+    for name in ("ada", "grace"):
+        user = make_user(name)
+        ServerMember.objects.create(server=server, user=user)
+        users.append(user)
+    return users
+
+
+def _assignee_ids(task):
+    return set(task.assignees.values_list("user_id", flat=True))
+
+
+def test_assign_accepts_several_users_as_json(api_client, owner, server, teammates):
+    task = Task.objects.create(title="Shared", server=server, assigned_by=owner)
+
+    response = api_client.post(
+        f"/api/v1/tasks/{server.id}/{task.id}/assign/",
+        {"user_ids": [str(user.id) for user in teammates]},
+        format="json",
+    )
+
+    assert response.status_code == 200
+    assert response.json()["task"]["assigned_to"]["username"] == "ada"
+    assert _assignee_ids(task) == {user.id for user in teammates}
+
+
+def test_assign_accepts_repeated_form_fields(api_client, owner, server, teammates):
+    task = Task.objects.create(title="Form", server=server, assigned_by=owner)
+
+    response = api_client.post(
+        f"/api/v1/tasks/{server.id}/{task.id}/assign/",
+        {"user_ids": [str(user.id) for user in teammates]},
+    )
+
+    assert response.status_code == 200
+    assert _assignee_ids(task) == {user.id for user in teammates}
+
+
+def test_assign_replaces_the_previous_assignees(api_client, owner, server, teammates):
+    task = Task.objects.create(title="Handover", server=server, assigned_by=owner)
+    url = f"/api/v1/tasks/{server.id}/{task.id}/assign/"
+    api_client.post(url, {"user_ids": [str(user.id) for user in teammates]}, format="json")
+
+    response = api_client.post(url, {"user_id": str(teammates[1].id)}, format="json")
+
+    assert response.status_code == 200
+    assert response.json()["task"]["assigned_to"]["username"] == "grace"
+    assert _assignee_ids(task) == {teammates[1].id}
+
+
+def test_assign_rejects_missing_ids_and_non_members(api_client, owner, server, teammates, make_user):
+    task = Task.objects.create(title="Guarded", server=server, assigned_by=owner)
+    outsider = make_user("outsider")
+    url = f"/api/v1/tasks/{server.id}/{task.id}/assign/"
+
+    missing = api_client.post(url, {}, format="json")
+    assert missing.status_code == 400
+    assert missing.json()["error"] == "user_ids or user_id is required"
+
+    rejected = api_client.post(url, {"user_ids": [str(teammates[0].id), str(outsider.id)]}, format="json")
+    assert rejected.status_code == 400
+    assert _assignee_ids(task) == set()
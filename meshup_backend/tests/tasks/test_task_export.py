@@ -0,0 +1,48 @@
+"""Tests for the streaming task export endpoint."""
+import json
+
+import pytest
+from django.test import AsyncClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.tasks.models import Task
+
+
+@pytest.fixture
+def tasks(owner, server):
+    for index in range(3):
+        Task.objects.create(
+            title=f"Task {index}",
+            server=server,
+            assigned_by=owner,
+            assigned_to=owner,
+            tags=["backend"] if index % 2 == 0 else [],
+        )
+
+
+@pytest.mark.django_db
+def test_export_streams_ndjson_matching_the_list(api_client, server, tasks):
+    response = api_client.get(f"/api/v1/tasks/{server.id}/export/?tag=backend")
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/x-ndjson"
+    assert response.streaming
+    lines = b"".join(response.streaming_content).splitlines()
+    rows = [json.loads(line) for line in lines]
+    listed = api_client.get(f"/api/v1/tasks/{server.id}/?tag=backend").json()["results"]
+    assert rows == listed
+    assert len(rows) == 2
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_export_streams_from_an_async_iterator_under_asgi(owner, server, tasks):
+    token = str(RefreshToken.for_user(owner).access_token)
+    client = AsyncClient()
+
+    response = await client.get(f"/api/v1/tasks/{server.id}/export/", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.is_async
+    body = b"".join([chunk async for chunk in response.streaming_content])
+    assert sorted(json.loads(line)["title"] for line in body.splitlines()) == ["Task 0", "Task 1", "Task 2"]
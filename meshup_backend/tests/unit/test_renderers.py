@@ -0,0 +1,81 @@
+"""OrjsonRenderer must stay byte-compatible with DRF's JSONRenderer."""
+import datetime
+import decimal
+import uuid
+
+import orjson
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from config import renderers
+from config.renderers import OrjsonRenderer
+
+DATA = {
+    "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "created_at": datetime.datetime(2025, 1, 2, 3, 4, 5, 678000, tzinfo=datetime.timezone.utc),
+    "amount": decimal.Decimal("1.50"),
+    "tags": ["a", "é", None],
+    "ratio": 0.25,
+    "note": "line\u2028break\u2029here",
+}
+
+
+def _configured(renderer_class, **settings):
+    renderer = renderer_class()
+    for name, value in {"strict": False, "ensure_ascii": False, "compact": True, **settings}.items():
+        setattr(renderer, name, value)
+    return renderer
+
+
+@pytest.fixture
+def orjson_calls(monkeypatch):
+    calls = []
+    original_dumps = orjson.dumps
+
+    def dumps(*args, **kwargs):
+        calls.append(args)
+        return original_dumps(*args, **kwargs)
+
+    monkeypatch.setattr(renderers.orjson, "dumps", dumps)
+    return calls
+
+
+def test_supported_configuration_uses_orjson_and_matches_drf(orjson_calls):
+    rendered = _configured(OrjsonRenderer).render(DATA)
+
+    assert orjson_calls
+    assert rendered == _configured(JSONRenderer).render(DATA)
+    assert b"\\u2028" in rendered
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [{"strict": True}, {"ensure_ascii": True}, {"compact": False}],
+    ids=["strict", "ascii", "non-compact"],
+)
+def test_other_configurations_defer_to_drf(settings, orjson_calls):
+    rendered = _configured(OrjsonRenderer, **settings).render(DATA)
+
+    assert not orjson_calls
+    assert rendered == _configured(JSONRenderer, **settings).render(DATA)
+
+
+def test_requested_indent_defers_to_drf(orjson_calls):
+    media_type = "application/json; indent=2"
+
+    rendered = _configured(OrjsonRenderer).render(DATA, media_type)
+
+    assert not orjson_calls
+    assert rendered == _configured(JSONRenderer).render(DATA, media_type)
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf")])
+def test_non_finite_floats(value):
+    with pytest.raises(ValueError):
+        _configured(OrjsonRenderer, strict=True).render({"scores": [value]})
+    # Documented difference of the supported configuration: orjson writes null.
+    assert _configured(OrjsonRenderer).render({"scores": [value]}) == b'{"scores":[null]}'
+
+
+def test_orjson_renderer_renders_none_as_empty_body():
+    assert OrjsonRenderer().render(None) == b""